@@ -10,6 +10,10 @@ class Config(metaclass=Singleton):
     api_data_endpoint: str
     username: str
     password: str
+    browser_user_data_dir: str | None
+    description_cache_path: str | None
+    customer_cache_path: str | None
+    incident_mirror_path: str | None
 
     def __init__(
         self,
@@ -17,11 +21,19 @@ class Config(metaclass=Singleton):
         api_data_endpoint: str,
         username: str,
         password: str,
+        browser_user_data_dir: str | None = None,
+        description_cache_path: str | None = None,
+        customer_cache_path: str | None = None,
+        incident_mirror_path: str | None = None,
     ) -> None:
         self.base_url = base_url
         self.api_data_endpoint = api_data_endpoint
         self.username = username
         self.password = password
+        self.browser_user_data_dir = browser_user_data_dir
+        self.description_cache_path = description_cache_path
+        self.customer_cache_path = customer_cache_path
+        self.incident_mirror_path = incident_mirror_path
 
     @classmethod
     def load(cls):
@@ -47,7 +59,13 @@ class Config(metaclass=Singleton):
 
         logger.debug(f"Config loaded: {required_vars}")
 
-        return cls(**required_vars)
+        return cls(
+            **required_vars,
+            browser_user_data_dir=os.getenv("BROWSER_USER_DATA_DIR") or None,
+            description_cache_path=os.getenv("DESCRIPTION_CACHE_PATH") or None,
+            customer_cache_path=os.getenv("CUSTOMER_CACHE_PATH") or None,
+            incident_mirror_path=os.getenv("INCIDENT_MIRROR_PATH") or None,
+        )
 
     @override
     def __repr__(self) -> str:
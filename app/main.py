@@ -7,6 +7,7 @@ from app.processes.handle_creation_failure import handle_creation_failure
 from packages.agents.categorizer import IncidentCategorizer
 from packages.crm.Query import CRMQuery
 from packages.crm.models import Contact, Incident
+from packages.crm.store import IncidentStore
 
 # Load configuration and environment variables
 # config = Config.load()g
@@ -35,10 +36,25 @@ async def main() -> None:
         #         logger.debug(f"Latest incidents: {latest}")
         #         json.dump(latest.model_dump(by_alias=False), f, ensure_ascii=False, indent=4)
         #         logger.info("Latest incidents saved to latest_incidents.json")
-        latest = None
-        with open("app/data/latest_incidents.json", "r") as f:
-            latest = json.load(f)
-            # logger.debug(f"Loaded latest incidents: {latest}")
+        config = Config.load()
+        if config.incident_mirror_path:
+            # Opt-in: the first sync mirrors every incident, descriptions
+            # included, into local SQLite
+            store = IncidentStore(config.incident_mirror_path)
+            try:
+                latest = await CRMQuery(api=api, store=store).get_latest_incident(
+                    top=10
+                )
+            finally:
+                store.close()
+            logger.debug(
+                f"Loaded {len(latest.value)} latest incidents from local mirror"
+            )
+        else:
+            latest = None
+            with open("app/data/latest_incidents.json", "r") as f:
+                latest = json.load(f)
+                # logger.debug(f"Loaded latest incidents: {latest}")
         data = {
             "title": "*Övriga ärenden",
             "description": "Meddelande\nHej\nJag har blivit förvaltare åt min mormor Inga och undrar hur jag går tillväga för att bl.a. få tillgång till hur mycket hon har på sitt kort.\nSka jag maila ett kort på beslutet från tingsrätten?\nMvh / Therese",
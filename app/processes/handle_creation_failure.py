@@ -1,37 +1,49 @@
 from asyncio import Task, create_task, gather
+from concurrent.futures import Executor
 from openpyxl import Workbook
 from typing import Tuple
 
+from app.config import Config
 from app.logger import logger
 from packages.crm.Query import CRMQuery
 from packages.crm.actions import (
     ActionDataResponse,
-    close_incident,
+    close_incidents,
     create_member,
-    get_customer_by_personal_number,
     CustomerSuccessResponse,
 )
-from packages.crm.models import (
-    CreationFailureIncident,
-    ODataResponse,
-)
+from packages.crm.models import CreationFailureIncident
 from packages.py_xlsx.core.worksheet import TypedWorkSheet
-from packages.utils.extract_data import ExtractedData, extract_key_values
+from packages.utils.extract_data import ExtractedData
 from packages.crm.api import CrmApi
+from packages.crm.customer_cache import CustomerLookupCache
+from packages.crm.pipeline import iter_creation_failures
 
 
-async def handle_creation_failure(api: CrmApi) -> None:
+async def handle_creation_failure(
+    api: CrmApi,
+    customer_cache: CustomerLookupCache | None = None,
+    executor: Executor | None = None,
+) -> None:
     """
     Process creation failure incidents by checking customer status and taking appropriate actions.
+
+    Args:
+        api: CrmApi instance
+        customer_cache: Cache for customer lookups. Defaults to an in-memory
+            cache, persisted to SQLite only when CUSTOMER_CACHE_PATH is set.
+            A cache created here is closed when the handler finishes.
+        executor: Optional executor, e.g. a ProcessPoolExecutor, that parses
+            descriptions in parallel while pages download.
     """
+    owns_cache = customer_cache is None
+    if customer_cache is None:
+        customer_cache = CustomerLookupCache(db_path=Config.load().customer_cache_path)
+
     try:
         q = CRMQuery(api=api)
-        mad = await q.call_user_query("incident", "creation_failure")
-        parsed = ODataResponse[CreationFailureIncident].model_validate_json(mad.text)
-
         extracted: list[Tuple[CreationFailureIncident, ExtractedData]] = [
-            (incident, extract_key_values(incident.description, incident.ticketnumber))
-            for incident in parsed.value
+            x async for x in iter_creation_failures(q, executor=executor)
         ]
 
         cap: list[Tuple[CreationFailureIncident, ExtractedData]] = [
@@ -44,7 +56,7 @@ async def handle_creation_failure(api: CrmApi) -> None:
 
         for incident in all_cases:
             user_task = create_task(
-                get_customer_by_personal_number(incident[1].Personnummer, api)
+                customer_cache.lookup(incident[1].Personnummer, api)
             )
             user_save_task_to_incident[user_task] = incident
             user_to_save_to_xlsx.append(user_task)
@@ -100,6 +112,7 @@ async def handle_creation_failure(api: CrmApi) -> None:
                     f"Failed to create member for {customer[1].Personnummer}: {result}"
                 )
             else:
+                customer_cache.invalidate(customer[1].Personnummer)
                 logger.info(
                     f"Successfully created member for {customer[1].Personnummer}"
                 )
@@ -115,40 +128,38 @@ async def handle_creation_failure(api: CrmApi) -> None:
         workbook = Workbook()
         worksheet = TypedWorkSheet(workbook, ExtractedData)
 
-        # Add each extracted data to worksheet
+        # Add all extracted data to the worksheet at once, falling back to
+        # one row at a time to skip rows openpyxl rejects
         cases_to_close: list[str] = []
-        for customer in not_found_customers:
-            try:
-                worksheet.append(customer[1])
-                cases_to_close.append(customer[0].incidentid)
-            except Exception as e:
-                logger.error(f"Failed to append customer to worksheet: {e}")
-                continue
+        try:
+            _ = worksheet.extend(customer[1] for customer in not_found_customers)
+            cases_to_close = [customer[0].incidentid for customer in not_found_customers]
+        except Exception as e:
+            logger.warning(f"Bulk append failed, appending rows one by one: {e}")
+            workbook = Workbook()
+            worksheet = TypedWorkSheet(workbook, ExtractedData)
+            for customer in not_found_customers:
+                try:
+                    worksheet.append(customer[1])
+                    cases_to_close.append(customer[0].incidentid)
+                except Exception as e:
+                    logger.error(f"Failed to append customer to worksheet: {e}")
+                    continue
 
         try:
             # Save the workbook first
             workbook.save("not_found_customers.xlsx")
 
-            # Create tasks for closing incidents
-            close_tasks = [
-                create_task(
-                    close_incident(
-                        incident_id=incident_id,
-                        api=api,
-                        subject="Medlemsservice_Manuella_medlemskap",
-                    )
-                )
-                for incident_id in cases_to_close
-            ]
-
-            # Gather all close tasks
-            close_results = await gather(*close_tasks, return_exceptions=True)
+            # Close all incidents through $batch requests
+            close_results = await close_incidents(
+                incident_ids=cases_to_close,
+                api=api,
+                subject="Medlemsservice_Manuella_medlemskap",
+            )
 
             # Process results
-            for incident_id, result in zip(cases_to_close, close_results):
-                if isinstance(result, Exception):
-                    logger.error(f"Failed to close incident {incident_id}: {result}")
-                else:
+            for incident_id, result in close_results.items():
+                if result.ok:
                     logger.info(f"Successfully closed incident {incident_id}")
 
         except Exception as e:
@@ -156,4 +167,7 @@ async def handle_creation_failure(api: CrmApi) -> None:
 
     except Exception as e:
         logger.error(f"Failed to handle creation failure: {e}")
-        raise 
\ No newline at end of file
+        raise
+    finally:
+        if owns_cache:
+            customer_cache.close() 
\ No newline at end of file
@@ -2,6 +2,7 @@ from app.config import Config
 from packages.crm.api import CrmApi
 from packages.crm.auth import Authenticate
 from packages.crm.models import User
+from packages.utils.description_cache import description_cache
 from app.logger import logger
 
 
@@ -9,15 +10,22 @@ async def setup():
     try:
         config = Config.load()
 
+        if config.description_cache_path:
+            description_cache.enable_disk(config.description_cache_path)
+
         user = User(username=config.username, password=config.password)
 
         authenticator = await Authenticate(
-            login_url=config.base_url, redirect_url=config.base_url
+            login_url=config.base_url,
+            redirect_url=config.base_url,
+            user_data_dir=config.browser_user_data_dir,
         ).login(user=user)
 
         if not authenticator.is_authenticated:
             raise Exception("Failed to authenticate user")
 
+        authenticator.start_background_refresh()
+
         api = CrmApi(
             base_url=config.base_url,
             api_data_endpoint=config.api_data_endpoint,
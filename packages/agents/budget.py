@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+
+class RateBudget:
+    """
+    Requests-per-minute and tokens-per-minute budget for an LLM provider.
+
+    Both budgets are token buckets that refill continuously, so a full
+    minute's budget can be spent in a burst and is then released at the
+    per-minute rate. Token costs are estimated before a call and corrected
+    with the reported usage afterwards.
+    """
+
+    requests_per_minute: float
+    tokens_per_minute: float
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = requests_per_minute
+        self._tokens = tokens_per_minute
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(
+            self.requests_per_minute,
+            self._requests + elapsed * self.requests_per_minute / 60,
+        )
+        self._tokens = min(
+            self.tokens_per_minute,
+            self._tokens + elapsed * self.tokens_per_minute / 60,
+        )
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request of `tokens` estimated tokens fits the budget."""
+        # A request larger than the whole budget would never fit
+        tokens = min(tokens, int(self.tokens_per_minute))
+
+        # The lock keeps waiters in arrival order
+        async with self._lock:
+            while True:
+                self._refill()
+                missing_requests = 1 - self._requests
+                missing_tokens = tokens - self._tokens
+                if missing_requests <= 0 and missing_tokens <= 0:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+
+                await asyncio.sleep(
+                    max(
+                        missing_requests * 60 / self.requests_per_minute,
+                        missing_tokens * 60 / self.tokens_per_minute,
+                    )
+                )
+
+    def correct(self, estimated: int, actual: int | None) -> None:
+        """Charge the difference between the estimated and the reported usage."""
+        if actual is None:
+            return
+        self._refill()
+        self._tokens -= actual - estimated
+
+
+def estimate_tokens(*texts: str, completion_tokens: int = 0) -> int:
+    """Rough token count of a prompt, about four characters per token."""
+    return sum(len(text) for text in texts) // 4 + completion_tokens
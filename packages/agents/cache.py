@@ -0,0 +1,97 @@
+import hashlib
+import json
+from typing import TypeVar
+
+from pydantic import BaseModel
+
+from app.logger import logger
+from packages.utils.cache import SqliteCache, TTLCache
+
+R = TypeVar("R", bound=BaseModel)
+
+
+def categorizer_fingerprint(
+    model_name: str, system_prompt: str, result_type: type[BaseModel]
+) -> str:
+    """
+    Hash everything besides the incident that decides a categorization.
+
+    The JSON schema of the result type contains the allowed category names,
+    so editing the prompt, the model or CategoryNames changes the fingerprint.
+    """
+    schema = json.dumps(result_type.model_json_schema(), sort_keys=True)
+    payload = "\0".join((model_name, system_prompt, schema))
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class CategorizeCache:
+    """
+    Persistent cache of categorization results keyed by incident content.
+
+    Keys are a hash of the exact user prompt (the incident JSON) combined with
+    the categorizer fingerprint. Entries written with another prompt, model
+    or set of categories are never read again and expire after `ttl`.
+
+    Example:
+        cache = CategorizeCache(db_path="app/data/categorize_cache.db")
+        categorizer = IncidentCategorizer(cache=cache)
+    """
+
+    ttl: float
+    disk_hits: int
+    _memory: TTLCache[str, str]
+    _disk: SqliteCache | None
+
+    def __init__(
+        self,
+        db_path: str | None = None,
+        maxsize: int = 1024,
+        ttl: float = 30 * 24 * 60 * 60,
+    ) -> None:
+        """
+        Args:
+            db_path: SQLite file, None keeps the cache in memory only.
+            maxsize: Results kept in memory.
+            ttl: Seconds a result is kept.
+        """
+        self.ttl = ttl
+        self.disk_hits = 0
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._disk = None
+        if db_path:
+            self._disk = SqliteCache(db_path, table="categorize_results")
+            removed = self._disk.purge_expired()
+            logger.debug(f"Categorize cache on {db_path}, purged {removed} expired entries")
+
+    @staticmethod
+    def key(fingerprint: str, user_prompt: str) -> str:
+        digest = hashlib.sha256(user_prompt.encode()).hexdigest()
+        return f"{fingerprint}:{digest}"
+
+    def get(self, key: str, result_type: type[R]) -> R | None:
+        raw = self._memory.get(key)
+        if raw is None and self._disk:
+            raw = self._disk.get(key)
+            if raw is not None:
+                self.disk_hits += 1
+                self._memory.set(key, raw)
+        return result_type.model_validate_json(raw) if raw is not None else None
+
+    def set(self, key: str, result: BaseModel) -> None:
+        raw = result.model_dump_json()
+        self._memory.set(key, raw)
+        if self._disk:
+            self._disk.set(key, raw, self.ttl)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self._memory.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self._memory.misses - self.disk_hits,
+            "size": len(self._memory),
+        }
+
+    def close(self) -> None:
+        if self._disk:
+            self._disk.close()
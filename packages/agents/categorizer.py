@@ -1,15 +1,28 @@
-from typing import Literal
+import asyncio
+import random
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Literal
 import logfire
 from pydantic import BaseModel
 from pydantic_ai import Agent
-from pydantic_ai.models import KnownModelName
+from pydantic_ai.models import KnownModelName, Model
+from pydantic_ai.result import Cost
 from app.logger import logger
+from packages.agents.budget import RateBudget, estimate_tokens
+from packages.agents.cache import CategorizeCache, categorizer_fingerprint
 from packages.crm.models import Incident
 
+if TYPE_CHECKING:
+    from packages.agents.rules import RuleClassifier
+
 logfire.configure()
 
 model: KnownModelName = "openai:gpt-4o"
 
+# Expected size of a CategorizeResult, used when estimating tokens per call
+COMPLETION_TOKENS_ESTIMATE = 600
+
 prompt = """
 ## **Systemprompt**
 
@@ -224,17 +237,219 @@ class CategorizeResult(BaseModel):
     nasta_steg: str
 
 
+@dataclass
+class Categorization:
+    """Result of categorizing one incident."""
+
+    data: CategorizeResult
+    cost: Cost = field(default_factory=Cost)
+    cached: bool = False
+    rule_based: bool = False
+    confidence: float | None = None
+
+
+@dataclass
+class CategorizerStats:
+    """How incidents were categorized, and how many model calls that saved."""
+
+    llm_calls: int = 0
+    cache_hits: int = 0
+    rule_hits: int = 0
+    rule_fallbacks: int = 0
+
+    @property
+    def calls_avoided(self) -> int:
+        return self.cache_hits + self.rule_hits
+
+    def report(self) -> str:
+        total = self.llm_calls + self.calls_avoided
+        share = self.calls_avoided / total if total else 0.0
+        return (
+            f"Avoided {self.calls_avoided} of {total} model calls ({share:.0%}): "
+            f"{self.rule_hits} by rules, {self.cache_hits} from cache. "
+            f"{self.rule_fallbacks} rule matches were below the threshold"
+        )
+
+
+@dataclass
+class CategorizeOutcome:
+    """Outcome of one incident in IncidentCategorizer.categorize_many."""
+
+    index: int
+    incident: Incident
+    result: Categorization | None = None
+    error: Exception | None = None
+    attempts: int = 0
+
+
 class IncidentCategorizer:
-    def __init__(self):
+    """
+    Categorizes incidents with an LLM.
+
+    Results are cached by the incident JSON together with the prompt, model
+    and category names, so unchanged incidents are not sent again.
+
+    Example:
+        categorizer = IncidentCategorizer(
+            cache=CategorizeCache(db_path="app/data/categorize_cache.db")
+        )
+        result = await categorizer.categorize(incident)
+        result.data.kategorier
+    """
+
+    agent: Agent[None, CategorizeResult]
+    cache: CategorizeCache | None
+    rules: "RuleClassifier | None"
+    rule_threshold: float
+    stats: CategorizerStats
+    fingerprint: str
+
+    def __init__(
+        self,
+        model: KnownModelName | Model = model,
+        cache: CategorizeCache | None = None,
+        rules: "RuleClassifier | None" = None,
+        rule_threshold: float = 0.8,
+    ):
+        """
+        Args:
+            model: Model name or instance, e.g. a TestModel in evaluations.
+            cache: Cache of earlier results, None to always call the model.
+            rules: Keyword classifier tried before the model.
+            rule_threshold: Confidence a rule match needs to be used instead
+                of calling the model.
+        """
         self.agent = Agent(
             model=model,
             result_type=CategorizeResult,
             system_prompt=prompt
         )
-
-    async def categorize(self, incident: Incident):
-        incident_json_string = incident.model_dump_json(
-            exclude={"contact": {"contactid"}})
+        self.cache = cache
+        self.rules = rules
+        self.rule_threshold = rule_threshold
+        self.stats = CategorizerStats()
+        model_name = model if isinstance(model, str) else model.name()
+        self.fingerprint = categorizer_fingerprint(model_name, prompt, CategorizeResult)
+
+    @staticmethod
+    def user_prompt(incident: Incident) -> str:
+        return incident.model_dump_json(exclude={"contact": {"contactid"}})
+
+    def _local(self, incident: Incident, key: str) -> Categorization | None:
+        """Categorize without the model, from the cache or the rules."""
+        if self.cache:
+            cached = self.cache.get(key, CategorizeResult)
+            if cached is not None:
+                logger.debug("Categorize result served from cache")
+                self.stats.cache_hits += 1
+                return Categorization(data=cached, cached=True)
+
+        if self.rules:
+            match = self.rules.classify(incident)
+            if match and match.confidence >= self.rule_threshold:
+                self.stats.rule_hits += 1
+                return Categorization(
+                    data=match.result, rule_based=True, confidence=match.confidence
+                )
+            if match:
+                self.stats.rule_fallbacks += 1
+
+        return None
+
+    async def _run(self, user_prompt: str, key: str) -> Categorization:
+        self.stats.llm_calls += 1
+        result = await self.agent.run(user_prompt=user_prompt)
+
+        if self.cache:
+            self.cache.set(key, result.data)
+
+        return Categorization(data=result.data, cost=result.cost())
+
+    async def categorize(self, incident: Incident) -> Categorization:
+        incident_json_string = self.user_prompt(incident)
         logger.debug(f"Incident JSON: {incident_json_string}")
-        result = await self.agent.run(user_prompt=incident_json_string)
-        return result
+
+        key = CategorizeCache.key(self.fingerprint, incident_json_string)
+        return self._local(incident, key) or await self._run(incident_json_string, key)
+
+    async def categorize_many(
+        self,
+        incidents: Iterable[Incident],
+        concurrency: int = 8,
+        requests_per_minute: float = 500,
+        tokens_per_minute: float = 30_000,
+        max_attempts: int = 3,
+    ) -> AsyncIterator[CategorizeOutcome]:
+        """
+        Categorize incidents concurrently, yielding each as it finishes.
+
+        Cached and rule matched incidents are yielded right away. The others
+        share a semaphore of `concurrency` calls and a rate budget whose
+        token cost is estimated from the prompt size. Failed calls are
+        retried with exponential backoff.
+
+        Example:
+            async for outcome in categorizer.categorize_many(incidents):
+                if outcome.result:
+                    ...
+
+        Args:
+            incidents: Incidents to categorize.
+            concurrency: Model calls in flight at once.
+            requests_per_minute: Request budget of the provider account.
+            tokens_per_minute: Token budget of the provider account.
+            max_attempts: Calls per incident before giving up.
+
+        Yields:
+            CategorizeOutcome: In completion order, with either a result or
+            the error of the last attempt.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        budget = RateBudget(requests_per_minute, tokens_per_minute)
+
+        async def run(index: int, incident: Incident) -> CategorizeOutcome:
+            outcome = CategorizeOutcome(index=index, incident=incident)
+            user_prompt = self.user_prompt(incident)
+            key = CategorizeCache.key(self.fingerprint, user_prompt)
+
+            outcome.result = self._local(incident, key)
+            if outcome.result:
+                return outcome
+
+            estimated = estimate_tokens(
+                prompt, user_prompt, completion_tokens=COMPLETION_TOKENS_ESTIMATE
+            )
+
+            while outcome.attempts < max_attempts:
+                outcome.attempts += 1
+                async with semaphore:
+                    await budget.acquire(estimated)
+                    try:
+                        outcome.result = await self._run(user_prompt, key)
+                        outcome.error = None
+                        budget.correct(estimated, outcome.result.cost.total_tokens)
+                        return outcome
+                    except Exception as e:
+                        outcome.error = e
+                        logger.warning(
+                            f"Categorizing incident {index} failed "
+                            f"(attempt {outcome.attempts}/{max_attempts}): {e}"
+                        )
+
+                # Back off without holding a slot
+                if outcome.attempts < max_attempts:
+                    await asyncio.sleep(2**outcome.attempts + random.random())
+
+            return outcome
+
+        tasks = [
+            asyncio.create_task(run(index, incident))
+            for index, incident in enumerate(incidents)
+        ]
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                _ = task.cancel()
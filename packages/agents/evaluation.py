@@ -0,0 +1,237 @@
+import asyncio
+import json
+import statistics
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any, get_args
+
+from pydantic import BaseModel
+from pydantic_ai.messages import (
+    Message,
+    ModelAnyResponse,
+    ModelStructuredResponse,
+    ToolCall,
+    UserPrompt,
+)
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from app.logger import logger
+from packages.agents.categorizer import (
+    Category,
+    CategorizeResult,
+    CategoryNames,
+    IncidentCategorizer,
+)
+from packages.agents.rules import RuleClassifier
+from packages.crm.models import Incident
+
+FALLBACK_CATEGORY: CategoryNames = "Övriga ärenden"
+
+
+class EvalCase(BaseModel):
+    """A labelled incident. Cases without expected categories are not scored."""
+
+    incident: Incident
+    expected: list[CategoryNames] = []
+
+
+def load_cases(path: str) -> list[EvalCase]:
+    with open(path, encoding="utf-8") as f:
+        return [EvalCase.model_validate(case) for case in json.load(f)]
+
+
+def seed_cases(latest_incidents_path: str, path: str) -> int:
+    """
+    Write unlabelled cases for the incidents in a latest_incidents.json dump.
+
+    Accepts both a list of incidents and an ODataResponse with a "value"
+    list. Fill in `expected` by hand before evaluating.
+
+    Returns:
+        int: Number of cases written.
+    """
+    with open(latest_incidents_path, encoding="utf-8") as f:
+        incidents: Any = json.load(f)
+
+    if isinstance(incidents, dict):
+        incidents = incidents.get("value", [])
+
+    cases = [
+        EvalCase(incident=Incident.model_validate(incident)).model_dump(mode="json")
+        for incident in incidents
+    ]
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cases, f, ensure_ascii=False, indent=4)
+
+    return len(cases)
+
+
+def rule_based_model(latency: float = 0.0) -> FunctionModel:
+    """
+    Offline stand-in for the LLM that answers with the rule classifier.
+
+    Incidents without a rule match get the fallback category. Gives a
+    deterministic baseline to compare prompt and model changes against.
+
+    Args:
+        latency: Seconds each call sleeps, to simulate a provider.
+    """
+    rules = RuleClassifier()
+
+    async def respond(messages: list[Message], info: AgentInfo) -> ModelAnyResponse:
+        if latency:
+            await asyncio.sleep(latency)
+
+        user_prompt = next(m for m in reversed(messages) if isinstance(m, UserPrompt))
+        data = json.loads(user_prompt.content)
+        # The categorizer leaves contactid out of the prompt
+        if data.get("contact"):
+            data["contact"].setdefault("contactid", "")
+        incident = Incident.model_validate(data)
+        match = rules.classify(incident)
+
+        result = (
+            match.result
+            if match
+            else CategorizeResult(
+                resonemang="Ingen regel matchade.",
+                personer=[],
+                kategorier=[Category(namn=FALLBACK_CATEGORY, forklaring="")],
+                nasta_steg="",
+            )
+        )
+        tool = info.result_tools[0]
+        return ModelStructuredResponse(
+            calls=[ToolCall.from_dict(tool.name, result.model_dump())]
+        )
+
+    return FunctionModel(respond)
+
+
+@dataclass
+class CategoryScore:
+    support: int = 0
+    predicted: int = 0
+    correct: int = 0
+
+    @property
+    def recall(self) -> float:
+        return self.correct / self.support if self.support else 0.0
+
+    @property
+    def precision(self) -> float:
+        return self.correct / self.predicted if self.predicted else 0.0
+
+
+@dataclass
+class EvalReport:
+    cases: int = 0
+    scored: int = 0
+    exact_matches: int = 0
+    errors: int = 0
+    latencies: list[float] = field(default_factory=list)
+    tokens: list[int] = field(default_factory=list)
+    cache_hits: int = 0
+    rule_hits: int = 0
+    categories: dict[str, CategoryScore] = field(default_factory=dict)
+
+    @property
+    def accuracy(self) -> float:
+        """Share of scored cases whose categories match the labels exactly."""
+        return self.exact_matches / self.scored if self.scored else 0.0
+
+    def latency_percentile(self, percentile: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[
+            percentile - 1
+        ]
+
+    @property
+    def tokens_per_case(self) -> float:
+        return sum(self.tokens) / self.cases if self.cases else 0.0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cache_hits / self.cases if self.cases else 0.0
+
+    def format(self) -> str:
+        lines = [
+            f"Cases: {self.cases} ({self.scored} labelled, {self.errors} errors)",
+            f"Exact match accuracy: {self.accuracy:.1%}",
+            f"Latency p50: {self.latency_percentile(50) * 1000:.0f} ms, "
+            f"p95: {self.latency_percentile(95) * 1000:.0f} ms",
+            f"Tokens per case: {self.tokens_per_case:.0f}",
+            f"Cache hit rate: {self.cache_hit_rate:.1%}, "
+            f"rule hit rate: {self.rule_hits / self.cases if self.cases else 0:.1%}",
+            "",
+            f"{'Category':<72} {'n':>4} {'recall':>7} {'precision':>9}",
+        ]
+        for name in get_args(CategoryNames):
+            score = self.categories.get(name)
+            if score and (score.support or score.predicted):
+                lines.append(
+                    f"{name:<72} {score.support:>4} "
+                    f"{score.recall:>7.1%} {score.precision:>9.1%}"
+                )
+        return "\n".join(lines)
+
+
+async def evaluate(
+    categorizer: IncidentCategorizer,
+    cases: Iterable[EvalCase],
+    concurrency: int = 4,
+) -> EvalReport:
+    """
+    Run a categorizer over labelled cases and score speed and correctness.
+
+    Args:
+        categorizer: Categorizer under test, with any model, cache or rules.
+        cases: Labelled incidents.
+        concurrency: Cases categorized at once.
+
+    Returns:
+        EvalReport: Accuracy per category, latency, tokens and cache hits.
+    """
+    report = EvalReport()
+    semaphore = asyncio.Semaphore(concurrency)
+    cache_hits_before = categorizer.stats.cache_hits
+    rule_hits_before = categorizer.stats.rule_hits
+
+    async def run(case: EvalCase) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await categorizer.categorize(case.incident)
+            except Exception as e:
+                logger.warning(f"Evaluation case failed: {e}")
+                report.errors += 1
+                return
+            report.latencies.append(time.perf_counter() - started)
+
+        report.tokens.append(result.cost.total_tokens or 0)
+
+        if not case.expected:
+            return
+
+        expected = set(case.expected)
+        predicted = {category.namn for category in result.data.kategorier}
+
+        report.scored += 1
+        report.exact_matches += expected == predicted
+
+        for name in expected | predicted:
+            score = report.categories.setdefault(name, CategoryScore())
+            score.support += name in expected
+            score.predicted += name in predicted
+            score.correct += name in expected and name in predicted
+
+    cases = list(cases)
+    report.cases = len(cases)
+    _ = await asyncio.gather(*(run(case) for case in cases))
+
+    report.cache_hits = categorizer.stats.cache_hits - cache_hits_before
+    report.rule_hits = categorizer.stats.rule_hits - rule_hits_before
+    return report
@@ -1,12 +1,29 @@
-from typing import Literal
-from pydantic import ValidationError
+from asyncio import Task, create_task, gather
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Generic, Literal, TypeVar
+from urllib.parse import quote
+import httpx
+from httpx._types import QueryParamTypes
+from pydantic import BaseModel, ValidationError
 from app.constants import EXCLUDE_STRING, MEDLEMSSERVICE_ID
-from packages.crm.api import CrmApi
+from packages.crm.api import CrmApi, prefer_header
 from packages.crm.models import Incident, ODataResponse
-from packages.crm.odata import OData
+from packages.crm.odata import OData, literal
 from app.logger import logger
 from packages.crm.types import RecordType
 
+if TYPE_CHECKING:
+    from packages.crm.store import IncidentStore
+
+M = TypeVar("M")
+B = TypeVar("B", bound=BaseModel)
+
+# Dataverse accepts GET urls up to 32 KB, stay well below to leave room for
+# $select/$expand and proxies with stricter limits
+MAX_FILTER_LENGTH = 8000
+
 
 UserQueries = Literal["creation_failure"]
 UserQueriesMap: dict[UserQueries, str] = {
@@ -14,77 +31,246 @@ UserQueriesMap: dict[UserQueries, str] = {
 }
 
 
+@lru_cache(maxsize=32)
+def latest_incident_odata(top: int) -> OData:
+    """The Medlemsservice queue query, built once per page size."""
+    return OData.from_model(
+        "incident",
+        Incident,
+        filter=[
+            f"_owningteam_value eq {literal(MEDLEMSSERVICE_ID)} and {
+                EXCLUDE_STRING} and statecode eq 0",
+        ],
+        orderby=["createdon asc"],
+        top=top,
+    )
+
+
+@dataclass
+class RecordsById(Generic[B]):
+    """Records found by id, in the order the ids were requested."""
+
+    found: dict[str, B] = field(default_factory=dict)
+    missing: list[str] = field(default_factory=list)
+
+
+def chunk_ids_for_in_filter(
+    ids: Iterable[str],
+    max_length: int = MAX_FILTER_LENGTH,
+) -> list[list[str]]:
+    """
+    Split ids into chunks whose url encoded In filter stays below max_length.
+    """
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    length = 0
+
+    for id in ids:
+        # Quoted literal plus the encoded separator
+        id_length = len(quote(literal(id), safe="")) + 3
+        if current and length + id_length > max_length:
+            chunks.append(current)
+            current, length = [], 0
+        current.append(id)
+        length += id_length
+
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+def in_filter(property_name: str, values: list[str]) -> str:
+    """Build a Microsoft.Dynamics.CRM.In filter expression."""
+    return (
+        f"Microsoft.Dynamics.CRM.In(PropertyName={literal(property_name)},"
+        f"PropertyValues=[{",".join(literal(v) for v in values)}])"
+    )
+
+
 class CRMQuery:
     _api: CrmApi
+    _store: "IncidentStore | None"
 
-    def __init__(self, api: CrmApi):
+    def __init__(self, api: CrmApi, store: "IncidentStore | None" = None):
+        """
+        Args:
+            api: Authenticated CrmApi.
+            store: Local incident mirror. When given, get_latest_incident
+                runs a delta sync and reads the queue from the mirror.
+        """
         self._api = api
+        self._store = store
 
     async def call_user_query(self, entity: RecordType, userquery: UserQueries):
+        """Call a saved view and return the raw response of the first page only.
+
+        Always goes to the CRM, saved view filters are evaluated server side.
+        """
         query = UserQueriesMap[userquery]
         endpoint = f"{entity}s"
 
         response = await self._api.get(endpoint, parameters=[("userQuery", query)])
         return response
 
-    async def get_latest_incident(self, top=10):
-        odata = OData(
-            entity="incident",
-            select=["title", "incidentid", "ticketnumber", "description"],
-            filter=[
-                f"_owningteam_value eq '{MEDLEMSSERVICE_ID}' and {
-                    EXCLUDE_STRING} and statecode eq 0",
-            ],
-            orderby=["createdon asc"],
-            top=top,
-            expand=[
-                OData(
-                    entity="customerid_contact",
-                    select=[
-                        "contactid",
-                        "coop_external_customer_id",
-                        "fullname",
-                        "emailaddress1",
-                    ],
-                ),
-            ],
+    async def iter_pages(
+        self,
+        model: type[M],
+        endpoint: str,
+        parameters: QueryParamTypes | None = None,
+        page_size: int | None = None,
+        prefetch: bool = True,
+        track_changes: bool = False,
+    ) -> AsyncIterator[ODataResponse[M]]:
+        """
+        Iterate over all pages of a collection, following @odata.nextLink.
+
+        Args:
+            model: Model each record is validated into.
+            endpoint: Entity set endpoint, e.g. "incidents", or an absolute
+                @odata.deltaLink.
+            parameters: Query parameters of the first request.
+            page_size: Sent as `Prefer: odata.maxpagesize`. The server default
+                (5000) is used when None.
+            prefetch: Request the next page while the current one is processed.
+            track_changes: Send `Prefer: odata.track-changes`, the last page
+                then carries an @odata.deltaLink.
+
+        Yields:
+            ODataResponse[model]: One validated page at a time.
+        """
+        headers = prefer_header(page_size, track_changes)
+        response_model = ODataResponse[model]
+
+        fetch_next: Callable[[], Awaitable[httpx.Response]] | None = (
+            (lambda: self._api.get_next_page(endpoint, headers=headers))
+            if endpoint.startswith(self._api.base_url)
+            else (
+                lambda: self._api.get(
+                    endpoint, parameters=parameters or [], headers=headers
+                )
+            )
         )
+        pending: Task[httpx.Response] | None = None
+        page_number = 0
 
-        response = await self._api.OData_request(odata=odata)
+        try:
+            while fetch_next or pending:
+                if pending is None and fetch_next:
+                    pending = create_task(fetch_next())
 
-        text = response.text
+                assert pending is not None
+                response = await pending
+                pending = None
+                page_number += 1
 
-        logger.debug(f"Response text: {text}")
+                page = response_model.model_validate_json(response.text)
+                del response
+
+                logger.debug(
+                    f"Fetched page {page_number} of {endpoint} with {len(page.value)} records"
+                )
+
+                fetch_next = None
+                if page.next_link:
+                    next_link = page.next_link
+                    fetch_next = lambda: self._api.get_next_page(
+                        next_link, headers=headers
+                    )
+                    if prefetch:
+                        pending = create_task(fetch_next())
+                        fetch_next = None
+
+                yield page
+        finally:
+            if pending and not pending.done():
+                _ = pending.cancel()
+
+    async def iter_records(
+        self,
+        model: type[M],
+        endpoint: str,
+        parameters: QueryParamTypes | None = None,
+        page_size: int | None = None,
+        prefetch: bool = True,
+    ) -> AsyncIterator[M]:
+        """Iterate over all records of a collection, one page in memory at a time."""
+        async for page in self.iter_pages(
+            model, endpoint, parameters, page_size=page_size, prefetch=prefetch
+        ):
+            for record in page.value:
+                yield record
+
+    def iter_raw_pages(
+        self,
+        endpoint: str,
+        parameters: QueryParamTypes | None = None,
+        page_size: int | None = None,
+        prefetch: bool = True,
+        track_changes: bool = False,
+    ) -> AsyncIterator[ODataResponse[dict[str, Any]]]:
+        """Like iter_pages, with each record left as the raw JSON object."""
+        return self.iter_pages(
+            dict,
+            endpoint,
+            parameters,
+            page_size=page_size,
+            prefetch=prefetch,
+            track_changes=track_changes,
+        )
+
+    def iter_user_query(
+        self,
+        model: type[M],
+        entity: RecordType,
+        userquery: UserQueries,
+        page_size: int | None = None,
+        prefetch: bool = True,
+    ) -> AsyncIterator[M]:
+        """Iterate over every record of a saved view, across all pages."""
+        return self.iter_records(
+            model,
+            f"{entity}s",
+            [("userQuery", UserQueriesMap[userquery])],
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+
+    def iter_odata(
+        self,
+        model: type[M],
+        odata: OData,
+        page_size: int | None = None,
+        prefetch: bool = True,
+    ) -> AsyncIterator[M]:
+        """Iterate over every record matching an OData collection query."""
+        return self.iter_records(
+            model,
+            odata.endpoint,
+            odata.params,
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+
+    async def get_latest_incident(self, top=10):
+        if self._store is not None:
+            _ = await self._store.sync(self)
+            return self._store.latest_incidents(top=top)
+
+        odata = latest_incident_odata(top)
 
         try:
-            return ODataResponse[Incident].model_validate_json(text)
+            return ODataResponse[Incident](
+                value=[
+                    incident async for incident in self.iter_odata(Incident, odata)
+                ]
+            )
         except ValidationError as e:
             logger.error(f"Response validation error: {e}")
             return None
 
     async def get_incident_by_id(self, incident_id: str):
-        odata = OData(
-            entity="incident",
-            id=incident_id,
-            select=[
-                "title",
-                "incidentid",
-                "ticketnumber",
-                "description",
-                "_subjectid_value",
-            ],
-            # expand=[
-            #     OData(
-            #         entity="customerid_contact",
-            #         select=[
-            #             "contactid",
-            #             "coop_external_customer_id",
-            #             "fullname",
-            #             "emailaddress1",
-            #         ],
-            #     ),
-            # ],
-        )
+        odata = OData.from_model("incident", Incident, id=incident_id)
 
         response = await self._api.OData_request(odata=odata)
 
@@ -97,3 +283,67 @@ class CRMQuery:
         except ValidationError as e:
             logger.error(f"Response validation error: {e}")
             return None
+
+    async def get_incidents_by_ids(
+        self,
+        ids: Iterable[str],
+        model: type[B] = Incident,
+        max_filter_length: int = MAX_FILTER_LENGTH,
+    ) -> RecordsById[B]:
+        """
+        Fetch many incidents by id with chunked Microsoft.Dynamics.CRM.In filters.
+
+        Chunks are sized to keep the url short and are requested concurrently.
+
+        Args:
+            ids: Incident ids, duplicates are fetched once.
+            model: Model the records are validated into. Its fields decide
+                $select and $expand.
+            max_filter_length: Maximum url encoded length of one In filter.
+
+        Returns:
+            RecordsById: Found records keyed by id in input order, and the
+            ids that returned no record.
+        """
+        requested = list(dict.fromkeys(ids))
+        chunks = chunk_ids_for_in_filter(requested, max_filter_length)
+
+        logger.debug(f"Fetching {len(requested)} incidents in {len(chunks)} requests")
+
+        async def fetch_chunk(chunk: list[str]) -> list[dict[str, Any]]:
+            odata = OData.from_model(
+                "incident", model, filter=[in_filter("incidentid", chunk)]
+            )
+            # The model may not select the key, which the records are matched on
+            if odata.select and "incidentid" not in odata.select:
+                odata = replace(odata, select=(*odata.select, "incidentid"))
+            return [
+                record
+                async for record in self.iter_records(
+                    dict[str, Any], odata.endpoint, odata.params
+                )
+            ]
+
+        pages = await gather(*(fetch_chunk(chunk) for chunk in chunks))
+
+        by_id: dict[str, dict[str, Any]] = {}
+        for records in pages:
+            for record in records:
+                incident_id = record.get("incidentid")
+                if incident_id is None:
+                    raise ValueError("Incident record returned without incidentid")
+                by_id[str(incident_id).lower()] = record
+
+        result: RecordsById[B] = RecordsById()
+        for incident_id in requested:
+            record = by_id.get(incident_id.lower())
+            if record is None:
+                result.missing.append(incident_id)
+            else:
+                result.found[incident_id] = model.model_validate(record)
+
+        if result.missing:
+            logger.warning(f"{len(result.missing)} incidents not found")
+            logger.debug(f"Missing incident ids: {result.missing}")
+
+        return result
@@ -1,14 +1,17 @@
 from dataclasses import asdict, dataclass
 from typing import Any, List, Literal, Union
 from packages.crm.api import CrmApi
+from packages.crm.batch import MAX_BATCH_OPERATIONS, BatchRequest, BatchResult
 from packages.crm.models import IncidentData
 from packages.utils.date import coop_date_today
+from packages.utils.trace import Tracer
 from app.logger import logger
 from collections.abc import MutableMapping
 from typing import Literal
 import json
+import os
 from packages.crm.types import RecordType, SubjectType, SubjectKeys
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, field_validator
 from datetime import datetime
 from typing import List
 import httpx
@@ -91,13 +94,8 @@ def case_description_wrapper(description: str):
 IncidentPatchDataType = MutableMapping[str, Any]
 
 
-async def update_incident(
-    incident_id: str,
-    patch_data: IncidentData,
-    api: CrmApi,
-    # subject: SubjectType | None = None,
-):
-    """Update an incident with optional subject"""
+def incident_patch_payload(patch_data: IncidentData) -> IncidentPatchDataType:
+    """Build the PATCH payload for an incident, resolving the subject binding"""
 
     if patch_data.description:
         patch_data.description = case_description_wrapper(patch_data.description)
@@ -113,22 +111,41 @@ async def update_incident(
                 continue
             _patch_data[key] = value
 
-    return await update_record(incident_id, "incident", _patch_data, api)
+    return _patch_data
 
 
-async def close_incident(
+async def update_incident(
     incident_id: str,
+    patch_data: IncidentData,
     api: CrmApi,
-    subject: SubjectType | None = None,
+    # subject: SubjectType | None = None,
 ):
-    """Close an incident"""
+    """Update an incident with optional subject"""
 
-    patch_data: IncidentData = IncidentData(
+    _patch_data = incident_patch_payload(patch_data)
+
+    return await update_record(incident_id, "incident", _patch_data, api)
+
+
+def close_incident_patch_data(subject: SubjectType | None = None) -> IncidentData:
+    """Patch data applied to an incident right before it is closed"""
+
+    return IncidentData(
         coop_resolvedon=coop_date_today(),
         coop_closecasenotification=False,
         subject=subject,
     )
 
+
+async def close_incident(
+    incident_id: str,
+    api: CrmApi,
+    subject: SubjectType | None = None,
+):
+    """Close an incident"""
+
+    patch_data: IncidentData = close_incident_patch_data(subject)
+
     # if resolution:
     #     patch_data["coop_resolution"] = resolution
 
@@ -150,6 +167,57 @@ async def close_incident(
     return close_response
 
 
+async def close_incidents(
+    incident_ids: list[str],
+    api: CrmApi,
+    subject: SubjectType | None = None,
+    max_operations: int = MAX_BATCH_OPERATIONS,
+) -> dict[str, BatchResult]:
+    """
+    Close many incidents using OData $batch requests.
+
+    Each incident gets its own change set holding the PATCH and the
+    CloseIncident action, so a failure only rolls back that incident.
+
+    Args:
+        incident_ids: Ids of the incidents to close
+        api: CrmApi instance
+        subject: Optional subject to set before closing
+        max_operations: Maximum number of operations per $batch request
+
+    Returns:
+        Mapping of incident id to the first failed result of its change set,
+        or the result of the CloseIncident action if both operations succeeded.
+    """
+    close_requests: dict[str, tuple[BatchRequest, BatchRequest]] = {}
+
+    async with api.batch(max_operations=max_operations) as batch:
+        for incident_id in incident_ids:
+            changeset = batch.changeset()
+            patch_request = changeset.patch(
+                endpoint=f"incidents({incident_id})",
+                data=dict(incident_patch_payload(close_incident_patch_data(subject))),
+            )
+            action = ActionMap.close_incident(incident_id)
+            close_request = changeset.post(endpoint=action.name, data=action.data)
+            close_requests[incident_id] = (patch_request, close_request)
+
+    results = {r.request.content_id: r for r in batch.results}
+    incident_results: dict[str, BatchResult] = {}
+
+    for incident_id, (patch_request, close_request) in close_requests.items():
+        patch_result = results[patch_request.content_id]
+        close_result = results[close_request.content_id]
+        incident_results[incident_id] = close_result if patch_result.ok else patch_result
+
+        if not incident_results[incident_id].ok:
+            logger.error(
+                f"Failed to close incident {incident_id}: {incident_results[incident_id].error}"
+            )
+
+    return incident_results
+
+
 async def close_notification(notification_id: str, api: CrmApi):
     """Close a notification"""
 
@@ -186,6 +254,12 @@ async def update_record(
     return patch_response
 
 
+customer_lookup_trace = Tracer(
+    "customer_lookup",
+    sample_rate=float(os.getenv("CUSTOMER_LOOKUP_TRACE_RATE", "0")),
+)
+
+
 # Load subjects from JSON file
 with open("app/data/subjects_converted.json", "r", encoding="utf-8") as f:
     subject_to_subjectid: dict[SubjectType, dict[SubjectKeys, str]] = json.load(f)
@@ -234,6 +308,14 @@ class ActionDataResponse(BaseModel):
     ResponseStatus: int
     Response: Union[CustomerSuccessResponse, CustomerErrorResponse]
 
+    @field_validator("Response", mode="before")
+    @classmethod
+    def parse_response_string(cls, value: Any) -> Any:
+        """The API returns Response as a JSON string, cached copies hold the object."""
+        if isinstance(value, (str, bytes)):
+            return json.loads(value)
+        return value
+
     def is_customer_without_membership(self) -> bool:
         """Case 1: Customer exists but has no membership (status 200, CustomerSuccessResponse with no mmId)"""
         return (
@@ -290,44 +372,30 @@ async def get_customer_by_personal_number(
         data=payload.model_dump(),
     )
 
-    response.raise_for_status()
-    raw_response = response.json()
-
-    print(f"\nDEBUG - Initial API Response for {personal_number}:")
-    print(json.dumps(raw_response, indent=2))
-
-    # Parse the Response field which is always a JSON string
-    response_data = json.loads(raw_response["Response"])
-
-    print("\nDEBUG - Parsed Response data:")
-    print(json.dumps(response_data, indent=2))
-
-    # If it's a 404, it should be mapped to CustomerErrorResponse
-    if raw_response["ResponseStatus"] == 404:
-        raw_response["Response"] = response_data  # Already parsed error response
-        print("\nDEBUG - Mapped to CustomerErrorResponse")
-    else:
-        # For 200 responses, we need to determine if it's a success or empty response
-        if isinstance(response_data, dict) and "kimCustomerId" in response_data:
-            print("\nDEBUG - Response data type before mapping:", type(response_data))
-            print("DEBUG - Response data before mapping:", response_data)
-            raw_response["Response"] = response_data  # CustomerSuccessResponse
-            print("\nDEBUG - Mapped to CustomerSuccessResponse")
-            print(
-                "DEBUG - Response type after mapping:", type(raw_response["Response"])
-            )
-        else:
-            raw_response["Response"] = {"items": []}  # CustomerEmptyResponse
-            print("\nDEBUG - Mapped to CustomerEmptyResponse")
-
-    print("\nDEBUG - Final data being sent to ActionDataResponse:")
-    print(json.dumps(raw_response, indent=2))
-
-    result = ActionDataResponse.model_validate(raw_response)
-    print("\nDEBUG - After Pydantic validation:")
-    print(f"Response discriminator type: {type(result.Response)}")
-    print(f"Response data: {result.Response}")
-    print(f"Raw dict: {result.model_dump()}")
+    return parse_customer_lookup(response, personal_number)
+
+
+def parse_customer_lookup(
+    response: httpx.Response,
+    personal_number: str,
+) -> ActionDataResponse:
+    """
+    Validate a coop_ActionDataFunction customer lookup response.
+
+    The outer JSON and the JSON string in its Response field are parsed in a
+    single validation pass. Set CUSTOMER_LOOKUP_TRACE_RATE to trace a sample
+    of lookups.
+    """
+    result = ActionDataResponse.model_validate_json(response.content)
+
+    if customer_lookup_trace.sampled():
+        customer_lookup_trace.record(
+            "customer_lookup",
+            personal_number=personal_number,
+            response_status=result.ResponseStatus,
+            response_type=type(result.Response).__name__,
+            raw_response=response.text,
+        )
 
     return result
 
@@ -1,30 +1,74 @@
 from collections.abc import MutableMapping
 from typing import Any, Literal
+import time
 
 import httpx
 from app.constants import USER_AGENT
 from app.logger import logger
 from packages.crm.auth import Authenticate
-from packages.crm.odata import OData, compile_odata_params
+from packages.crm.batch import MAX_BATCH_OPERATIONS, CrmBatch
+from packages.crm.limiter import (
+    THROTTLE_STATUS_CODES,
+    AdaptiveLimiter,
+    is_retryable,
+    retry_after_seconds,
+)
+from packages.crm.odata import OData
 from httpx import AsyncClient, QueryParams, Headers
 from httpx._types import QueryParamTypes
 
+PREFER_ANNOTATIONS = (
+    "odata.include-annotations=OData.Community.Display.V1.FormattedValue"
+)
+
+
+def prefer_header(
+    page_size: int | None = None,
+    track_changes: bool = False,
+) -> dict[str, str] | None:
+    """
+    Build a Prefer header that keeps the default annotations.
+
+    Args:
+        page_size (int | None): Sent as odata.maxpagesize.
+        track_changes (bool): Ask for change tracking, the last page then
+            carries an @odata.deltaLink.
+
+    Returns:
+        dict[str, str] | None: The header, or None if the defaults suffice.
+    """
+    preferences = [PREFER_ANNOTATIONS]
+    if page_size:
+        preferences.append(f"odata.maxpagesize={page_size}")
+    if track_changes:
+        preferences.append("odata.track-changes")
+
+    return {"Prefer": ",".join(preferences)} if len(preferences) > 1 else None
+
 
 class CrmApi:
     base_url: str
     api_data_endpoint: str
     authenticator: Authenticate
+    limiter: AdaptiveLimiter
+    max_retries: int
     _client: AsyncClient
+    _cookies_version: int
 
     def __init__(
         self,
         base_url: str,
         api_data_endpoint: str,
         authenticator: Authenticate,
+        limiter: AdaptiveLimiter | None = None,
+        max_retries: int = 5,
     ) -> None:
         self.base_url = base_url
         self.api_data_endpoint = api_data_endpoint
         self.authenticator = authenticator
+        self.limiter = limiter or AdaptiveLimiter()
+        self.max_retries = max_retries
+        self._cookies_version = self.authenticator.cookies_version
 
         self._client = AsyncClient(
             cookies=self.authenticator.cookies_as_tuples(),
@@ -32,7 +76,7 @@ class CrmApi:
                 "User-Agent": USER_AGENT,
                 "OData-MaxVersion": "4.0",
                 "OData-Version": "4.0",
-                "Prefer": "odata.include-annotations=OData.Community.Display.V1.FormattedValue",
+                "Prefer": PREFER_ANNOTATIONS,
             },
         )
 
@@ -41,9 +85,12 @@ class CrmApi:
         try:
             if not self.authenticator.is_authenticated:
                 logger.info("Authentication expired, refreshing...")
-                self._client.cookies = (
-                    await self.authenticator.login()
-                ).cookies_as_tuples()
+                _ = await self.authenticator.login()
+
+            # Pick up cookies renewed by any login, including background refreshes
+            if self._cookies_version != self.authenticator.cookies_version:
+                self._client.cookies = self.authenticator.cookies_as_tuples()
+                self._cookies_version = self.authenticator.cookies_version
         except Exception as e:
             logger.error(f"Authentication refresh failed: {e}")
             raise
@@ -55,16 +102,23 @@ class CrmApi:
         parameters: QueryParamTypes | None = None,
         headers: MutableMapping[str, str] | Headers | None = None,
         data: MutableMapping[str, Any] | None = None,
+        content: bytes | None = None,
     ) -> httpx.Response:
         """
         Makes an HTTP request to the CRM API.
 
+        Requests go through the adaptive concurrency limiter. Throttled
+        responses are retried after the server's Retry-After, up to
+        `max_retries` times: 429 for every method, 503 only for idempotent
+        methods, since a POST or PATCH may have been applied before it.
+
         Args:
             path (str): The API endpoint path.
             method (Literal["GET", "POST", "PUT", "DELETE", "PATCH"]): The HTTP method.
             parameters (QueryParamTypes | None): Query parameters.
             headers (MutableMapping[str, str] | Headers | None): HTTP headers.
             data (MutableMapping[str, Any] | None): The request payload.
+            content (bytes | None): A raw request body, used instead of `data`.
 
         Returns:
             httpx.Response: The HTTP response.
@@ -72,18 +126,51 @@ class CrmApi:
         try:
             await self._ensure_authenticated()
 
-            if parameters is None:
-                parameters = QueryParams()
+            # Absolute urls (e.g. @odata.nextLink) already carry their query
+            # string, which httpx would replace with empty params
+            if path.startswith(self.base_url):
+                url = path
+            else:
+                url = f"{self.base_url}/{path}"
+                if parameters is None:
+                    parameters = QueryParams()
 
-            url = f"{self.base_url}/{path}"
+            for attempt in range(self.max_retries + 1):
+                async with self.limiter.slot():
+                    started = time.monotonic()
 
-            response = await self._client.request(
-                method=method,
-                url=url,
-                params=parameters,
-                headers=headers,
-                json=data,
-            )
+                    response = await self._client.request(
+                        method=method,
+                        url=url,
+                        params=parameters,
+                        headers=headers,
+                        json=data,
+                        content=content,
+                    )
+
+                    if response.status_code in THROTTLE_STATUS_CODES:
+                        retry_after = retry_after_seconds(response.headers, attempt)
+                        # Also on the last attempt, so the limiter never
+                        # counts a throttled response as a success
+                        self.limiter.record_throttle(retry_after)
+                        if attempt < self.max_retries and is_retryable(
+                            response.status_code, method
+                        ):
+                            logger.warning(
+                                f"{method} {path} throttled ({response.status_code}), "
+                                f"retry {attempt + 1}/{self.max_retries} in {retry_after:.1f}s"
+                            )
+                            continue
+                        break
+
+                    # A $batch takes as long as its operations, which says
+                    # nothing about congestion
+                    is_batch = url.rstrip("/").endswith("$batch")
+                    self.limiter.record_success(
+                        None if is_batch else time.monotonic() - started,
+                        request_class=method,
+                    )
+                    break
 
             _ = response.raise_for_status()
 
@@ -97,10 +184,26 @@ class CrmApi:
         self,
         endpoint: str,
         parameters: QueryParamTypes,
+        headers: MutableMapping[str, str] | Headers | None = None,
     ):
         url = f"{self.api_data_endpoint}/{endpoint}"
 
-        return await self.request(method="GET", path=url, parameters=parameters)
+        return await self.request(
+            method="GET", path=url, parameters=parameters, headers=headers
+        )
+
+    async def get_next_page(
+        self,
+        next_link: str,
+        headers: MutableMapping[str, str] | Headers | None = None,
+    ):
+        """
+        Follow an @odata.nextLink.
+
+        The link already carries the original query options and the paging
+        cookie, so it is requested as is.
+        """
+        return await self.request(method="GET", path=next_link, headers=headers)
 
     async def patch(
         self,
@@ -142,20 +245,25 @@ class CrmApi:
 
         return response
 
+    def batch(self, max_operations: int = MAX_BATCH_OPERATIONS) -> CrmBatch:
+        """
+        Create a $batch builder bound to this API.
+
+        Args:
+            max_operations (int): Maximum number of operations per $batch request.
+
+        Returns:
+            CrmBatch: Use as an async context manager or call `execute()`.
+        """
+        return CrmBatch(self, max_operations=max_operations)
+
     async def OData_request(
         self,
         odata: OData,
     ):
         """Make an OData request to the CRM API."""
         try:
-            params = compile_odata_params(odata)
-
-            endpoint = odata.entity + "s"
-
-            if odata.id:
-                endpoint = f"({odata.id})"
-
-            return await self.get(endpoint=endpoint, parameters=params)
+            return await self.get(endpoint=odata.endpoint, parameters=odata.params)
         except Exception as e:
             logger.error(f"OData request failed: {e}")
             raise
@@ -1,23 +1,67 @@
-from typing import Any
-from playwright.async_api import async_playwright, TimeoutError
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Literal, get_args
+from playwright.async_api import Browser, Page, async_playwright, TimeoutError
 import json
 import os
+import tempfile
 import time
 from app.constants import USER_AGENT
 from packages.crm.models import User, Cookie
 from app.logger import logger
 
 
+LoginMode = Literal["cold", "warm"]
+
+
+@dataclass
+class LoginTiming:
+    """Duration of one successful login"""
+
+    mode: LoginMode
+    launch_seconds: float
+    total_seconds: float
+
+
 class Authenticate:
     _cookies: dict[str, Cookie] = {}
     _user: User | None = None
     _cookie_file_path: str = os.path.join(os.getcwd(), "app", "data", "cookies.json")
     _login_url: str
     _redirect_url: str
-
-    def __init__(self, login_url: str, redirect_url: str):
+    _user_data_dir: str | None
+    _session_login_timeout: float
+    login_timings: list["LoginTiming"]
+    _cookies_version: int = 0
+    _expiry_buffer: float = 300
+    _expires_at: float | None = None
+    _valid_until: float = 0.0
+    _cookie_file_loaded_mtime: float | None = None
+    _login_task: "asyncio.Task[Authenticate] | None" = None
+    _refresh_task: "asyncio.Task[None] | None" = None
+
+    def __init__(
+        self,
+        login_url: str,
+        redirect_url: str,
+        user_data_dir: str | None = None,
+        session_login_timeout: float = 30000,
+    ):
+        """
+        Args:
+            login_url (str): CRM url that redirects to the Microsoft login.
+            redirect_url (str): CRM url the login ends up on.
+            user_data_dir (str | None): Keep the browser profile, and with it the
+                Microsoft session, in this directory between logins. Logins then
+                usually only need a single navigation.
+            session_login_timeout (float): Milliseconds to wait for a stored
+                session to reach the CRM before falling back to the credentials.
+        """
         self._login_url = login_url
         self._redirect_url = redirect_url
+        self._user_data_dir = user_data_dir
+        self._session_login_timeout = session_login_timeout
+        self.login_timings = []
         _ = self.load_cookies()
 
     async def _log_page_state(self, page, message):
@@ -54,23 +98,41 @@ class Authenticate:
         except Exception as e:
             logger.error(f"Error in debug logging: {str(e)}")
 
-    async def login(self, user: User | None = None):
+    async def login(
+        self, user: User | None = None, force: bool = False, session_only: bool = False
+    ):
         """
         Authenticates the user using Playwright to automate browser actions.
 
+        Only one browser login runs at a time. Callers arriving while a login
+        is in progress wait for that login instead of starting their own.
+
         Args:
             user (User | None): The user credentials. If None, uses the existing user.
+            force (bool): Log in even if the current cookies are still valid.
+            session_only (bool): Only try the warm login with the persistent
+                browser profile, never the credential and MFA flow, which
+                needs a person. Used by the background refresh.
 
         Raises:
             ValueError: If no user is provided for authentication.
             Exception: For various authentication failures.
         """
-        logger.debug("Starting login process")
-
-        if self.is_authenticated:
+        if not force and self.is_authenticated:
             logger.debug("User already authenticated")
             return self
 
+        if self._login_task is None or self._login_task.done():
+            self._login_task = asyncio.create_task(self._login(user, session_only))
+        else:
+            logger.debug("Login already in progress, waiting for it to finish")
+
+        # Shield so a cancelled caller doesn't cancel the login for everyone
+        return await asyncio.shield(self._login_task)
+
+    async def _login(self, user: User | None = None, session_only: bool = False):
+        logger.debug("Starting login process")
+
         _user = user or self._user
         if _user is None:
             logger.error("No user provided for authentication")
@@ -79,19 +141,35 @@ class Authenticate:
         self._user = _user
         logger.debug(f"Attempting login for user: {_user.username}")
 
+        started = time.perf_counter()
+
         async with async_playwright() as playwright:
+            browser: Browser | None = None
+            browser_args = [
+                "--start-maximized",
+                "--disable-infobars",
+                "--disable-extensions",
+            ]
+
             try:
-                logger.debug("Launching browser")
-
-                browser = await playwright.chromium.launch(
-                    headless=True,
-                    channel="chrome",
-                    args=[
-                        "--start-maximized",
-                        "--disable-infobars",
-                        "--disable-extensions",
-                    ],
-                )
+                if self._user_data_dir:
+                    logger.debug(
+                        f"Launching persistent browser context: {self._user_data_dir}"
+                    )
+                    context = await playwright.chromium.launch_persistent_context(
+                        self._user_data_dir,
+                        headless=True,
+                        channel="chrome",
+                        args=browser_args,
+                        user_agent=USER_AGENT,
+                    )
+                else:
+                    logger.debug("Launching browser")
+                    browser = await playwright.chromium.launch(
+                        headless=True,
+                        channel="chrome",
+                        args=browser_args,
+                    )
             except TimeoutError:
                 logger.error("Browser launch timed out")
                 return self
@@ -99,251 +177,24 @@ class Authenticate:
                 logger.error(f"Failed to launch browser: {str(e)}")
                 return self
 
-            logger.debug("Creating new browser context")
-            context = await browser.new_context(user_agent=USER_AGENT)
-            page = await context.new_page()
-
-            try:
-                logger.debug(f"Navigating to login URL: {self._login_url}")
-                _ = await page.goto(self._login_url, timeout=60000)
-                _ = await page.wait_for_function(
-                    'window.location.href.startsWith("https://login.microsoftonline.com")',
-                    timeout=60000,
-                )
-
-                # content = await page.content()
-                # with open("login_content.html", "w") as f:
-                #     f.write(content)
-
-                logger.debug("Waiting for username input")
-                user_name_element = await page.wait_for_selector(
-                    "input[name='loginfmt']"
-                )
-
-                if not user_name_element:
-                    logger.error("Failed to find username input element")
-                    raise Exception("Failed to find username input element")
-
-                _ = await user_name_element.fill(_user.username)
-                _ = await user_name_element.press("Enter")
-                logger.debug("Username entered successfully")
+            if browser:
+                logger.debug("Creating new browser context")
+                context = await browser.new_context(user_agent=USER_AGENT)
 
-                # content = await page.content()
-                # with open("login_content_2.html", "w") as f:
-                #     f.write(content)
+            page = context.pages[0] if context.pages else await context.new_page()
+            launch_seconds = time.perf_counter() - started
 
-                logger.debug("Waiting for password input")
-                password_element = await page.wait_for_selector(
-                    "input[name='passwd']", timeout=20000
-                )
-
-                if not password_element:
-                    logger.error("Failed to find password input element")
-                    raise Exception("Failed to find password input element")
-
-                # Fill in password
-                await password_element.fill(_user.password)
-                logger.debug("Password filled")
-
-                # Small delay before pressing Enter
-                await page.wait_for_timeout(1000)
-
-                try:
-                    # Re-get the password element to ensure it's still attached
-                    password_element = await page.wait_for_selector(
-                        "input[name='passwd']",
-                        timeout=5000,
-                        state="visible"
-                    )
-                    
-                    if not password_element:
-                        raise Exception("Password element not found before pressing Enter")
-                        
-                    # Try to press Enter on the element
-                    await password_element.press("Enter")
-                    logger.debug("Pressed Enter on password field")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to press Enter on password field: {str(e)}")
-                    # Try alternative method - keyboard press
-                    try:
-                        await page.keyboard.press("Enter")
-                        logger.debug("Pressed Enter using keyboard")
-                    except Exception as e2:
-                        logger.error(f"Failed to press Enter using keyboard: {str(e2)}")
-                        raise
-
-                # Wait for navigation/processing
-                try:
-                    # Wait for URL change or new elements
-                    await page.wait_for_function(
-                        """() => {
-                            return document.querySelector('#idDiv_SAOTCS_Proofs') !== null || 
-                                   document.querySelector('.error') !== null ||
-                                   document.querySelector('#passwordError') !== null ||
-                                   document.querySelector('[data-value="PhoneAppNotification"]') !== null ||
-                                   document.querySelector('#idSIButton9') !== null
-                        }""",
-                        timeout=15000
-                    )
-                    
-                    # Add a small delay to let any animations complete
-                    await page.wait_for_timeout(2000)
-                    
-                    # Save the current page state for debugging
-                    # content = await page.content()
-                    # with open("after_password.html", "w", encoding="utf-8") as f:
-                    #     f.write(content)
-                    # await page.screenshot(path="after_password.png")
-                    
-                    logger.debug("Password page processed successfully")
-                except Exception as e:
-                    logger.error(f"Error after password submission: {str(e)}")
-                    # Save the page state for debugging
-                    # content = await page.content()
-                    # with open("password_error.html", "w", encoding="utf-8") as f:
-                    #     f.write(content)
-                    # await page.screenshot(path="password_error.png")
-                    raise
-
-                logger.debug("Waiting for phone authentication")
-
-                try:
-                    # Add a longer delay after password entry to let the page fully load
-                    await page.wait_for_timeout(5000)
-                    
-                    # Try to find any verification/authentication related elements
-                    verification_selectors = [
-                        "#idDiv_SAOTCS_Proofs",
-                        "[data-bind*='phoneAppNotification']",
-                        "[data-value='PhoneAppNotification']",
-                        "input[aria-label*='Notification']",
-                        "input[aria-label*='notification']",
-                        "div[data-value*='Phone']",
-                        "#idDiv_SAOTCC_Section",
-                        "[role='radiogroup']"
-                    ]
-                    
-                    # Log the current page state
-                    # content = await page.content()
-                    # with open("verification_page.html", "w", encoding="utf-8") as f:
-                    #     f.write(content)
-                    # await page.screenshot(path="verification_page.png")
-                    
-                    # Try each selector
-                    phone_auth_element = None
-                    for selector in verification_selectors:
-                        try:
-                            logger.debug(f"Trying to find element with selector: {selector}")
-                            element = await page.wait_for_selector(selector, timeout=3000, state="visible")
-                            if element:
-                                # Check if this is a container or the actual element
-                                if await element.evaluate('el => el.tagName === "DIV"'):
-                                    # If it's a container, look for the phone option inside it
-                                    possible_elements = await element.query_selector_all('input[type="radio"], div[role="button"], button')
-                                    for possible in possible_elements:
-                                        html = await possible.evaluate('el => el.outerHTML')
-                                        logger.debug(f"Found possible element: {html}")
-                                        if any(keyword in html.lower() for keyword in ['phone', 'notification', 'mobil']):
-                                            phone_auth_element = possible
-                                            break
-                                else:
-                                    phone_auth_element = element
-                                
-                                if phone_auth_element:
-                                    logger.debug("Found phone authentication element")
-                                    break
-                        except Exception as e:
-                            logger.debug(f"Selector {selector} failed: {str(e)}")
-                            continue
-
-                    if not phone_auth_element:
-                        # Try an alternative approach - look for any clickable elements
-                        logger.debug("Trying alternative approach to find authentication element")
-                        elements = await page.query_selector_all('input[type="radio"], div[role="button"], button')
-                        for element in elements:
-                            try:
-                                html = await element.evaluate('el => el.outerHTML')
-                                text = await element.evaluate('el => el.textContent || el.value || el.getAttribute("aria-label") || ""')
-                                logger.debug(f"Found element: {text} with HTML: {html}")
-                                if any(keyword in (html + text).lower() for keyword in ['phone', 'notification', 'mobil', 'authenticator']):
-                                    phone_auth_element = element
-                                    logger.debug(f"Found authentication element with text: {text}")
-                                    break
-                            except Exception as e:
-                                logger.debug(f"Error checking element: {str(e)}")
-                                continue
-
-                    if not phone_auth_element:
-                        logger.error("Failed to find phone authentication element")
-                        raise Exception("Failed to find phone authentication element")
-
-                    # Add a delay before clicking
-                    await page.wait_for_timeout(1000)
-                    
-                    # Try to click the element
-                    try:
-                        await phone_auth_element.click()
-                        logger.debug("Successfully clicked phone authentication element")
-                    except Exception as e:
-                        logger.error(f"Failed to click element: {str(e)}")
-                        # Try JavaScript click as fallback
-                        await page.evaluate('element => element.click()', phone_auth_element)
-                        logger.debug("Clicked element using JavaScript")
-
-                except Exception as e:
-                    logger.error(f"Error during phone authentication: {str(e)}")
-                    # Save debug info
-                    # await page.screenshot(path="auth_error.png")
-                    # content = await page.content()
-                    # with open("auth_error.html", "w", encoding="utf-8") as f:
-                    #     f.write(content)
-                    raise
-
-                logger.debug("Waiting for authentication number")
-                auth_number_element = await page.wait_for_selector(
-                    ".display-sign-container", timeout=60000
-                )
-
-                if not auth_number_element:
-                    logger.error("Failed to find authentication number element")
-                    raise Exception("Failed to find authentication number element")
-
-                auth_number = await auth_number_element.text_content()
-
-                if not auth_number:
-                    logger.error("Failed to get authentication number")
-                    raise Exception("Failed to get authentication number")
-
-                auth_number = auth_number.replace(" ", "").replace("\n", "")
-
-                logger.debug(f"Authentication number received: {auth_number}")
-
-                print(
-                    (
-                        f"\n{"=" * 50}"
-                        f"\nAUTHENTICATION NUMBER: {auth_number}"
-                        f"\nPlease enter this number in your phone app"
-                        f"\n{"=" * 50}"
+            try:
+                if self._user_data_dir and await self._session_login(page):
+                    mode: LoginMode = "warm"
+                elif session_only:
+                    logger.warning(
+                        "Session login failed, not falling back to a credential login"
                     )
-                )
-
-                logger.debug("Waiting for stay signed in option")
-                stay_signed_in_element = await page.wait_for_selector(
-                    "input[type='submit']"
-                )
-
-                if not stay_signed_in_element:
-                    logger.error("Failed to find stay signed in element")
-                    raise Exception("Failed to find stay signed in element")
-
-                await stay_signed_in_element.click()
-
-                logger.debug("Waiting for redirect to main page")
-                await page.wait_for_url(
-                    "https://coopcrmprod.crm4.dynamics.com/main.aspx?forceUCI=1&pagetype=apps",
-                    timeout=60000,
-                )
+                    return self
+                else:
+                    await self._credential_login(page, _user)
+                    mode = "cold"
 
                 cookies_to_grab = [
                     "orgId",
@@ -366,14 +217,25 @@ class Authenticate:
                     if c.get("name") in cookies_to_grab
                 }
 
-                self._cookies = grabbed_cookies
+                self._set_cookies(grabbed_cookies)
 
                 if not self.cookies:
                     logger.error("No cookies were captured after authentication")
                     return self
 
-                logger.info("Authentication completed successfully")
+                timing = LoginTiming(
+                    mode=mode,
+                    launch_seconds=launch_seconds,
+                    total_seconds=time.perf_counter() - started,
+                )
+                self.login_timings.append(timing)
+
+                logger.info(
+                    f"Authentication completed successfully ({mode} login in "
+                    f"{timing.total_seconds:.1f}s, browser launch {timing.launch_seconds:.1f}s)"
+                )
                 logger.debug(f"Captured {len(self._cookies)} cookies")
+                logger.debug(f"Login timing summary: {self.login_timing_summary()}")
 
             except TimeoutError as e:
                 logger.error(f"Timeout during authentication process: {str(e)}")
@@ -383,39 +245,464 @@ class Authenticate:
                 return self
             finally:
                 logger.debug("Closing browser")
-                await browser.close()
+                if browser:
+                    await browser.close()
+                else:
+                    await context.close()
                 self.save_cookies()
                 return self
 
+    async def _session_login(self, page: Page) -> bool:
+        """
+        Try to reuse the Microsoft session stored in the persistent profile.
+
+        Returns:
+            bool: True if navigating to the CRM landed on the main page without
+            going through the credential flow.
+        """
+        logger.debug(f"Trying stored session login: {self._login_url}")
+        _ = await page.goto(self._login_url, timeout=60000)
+
+        try:
+            await page.wait_for_url(
+                "**/main.aspx**", timeout=self._session_login_timeout
+            )
+        except TimeoutError:
+            logger.info("Stored session was not accepted, using credential login")
+            return False
+
+        logger.debug("Stored session accepted")
+        return True
+
+    def login_timing_summary(self) -> dict[LoginMode, float]:
+        """Average total login time in seconds per login mode."""
+        summary: dict[LoginMode, float] = {}
+        for mode in get_args(LoginMode):
+            timings = [t.total_seconds for t in self.login_timings if t.mode == mode]
+            if timings:
+                summary[mode] = sum(timings) / len(timings)
+        return summary
+
+    async def _credential_login(self, page: Page, _user: User) -> None:
+        """Run the full Microsoft username/password/MFA login flow."""
+        logger.debug(f"Navigating to login URL: {self._login_url}")
+        _ = await page.goto(self._login_url, timeout=60000)
+        _ = await page.wait_for_function(
+            'window.location.href.startsWith("https://login.microsoftonline.com")',
+            timeout=60000,
+        )
+
+        # content = await page.content()
+        # with open("login_content.html", "w") as f:
+        #     f.write(content)
+
+        logger.debug("Waiting for username input")
+        user_name_element = await page.wait_for_selector(
+            "input[name='loginfmt']"
+        )
+
+        if not user_name_element:
+            logger.error("Failed to find username input element")
+            raise Exception("Failed to find username input element")
+
+        _ = await user_name_element.fill(_user.username)
+        _ = await user_name_element.press("Enter")
+        logger.debug("Username entered successfully")
+
+        # content = await page.content()
+        # with open("login_content_2.html", "w") as f:
+        #     f.write(content)
+
+        logger.debug("Waiting for password input")
+        password_element = await page.wait_for_selector(
+            "input[name='passwd']", timeout=20000
+        )
+
+        if not password_element:
+            logger.error("Failed to find password input element")
+            raise Exception("Failed to find password input element")
+
+        # Fill in password
+        await password_element.fill(_user.password)
+        logger.debug("Password filled")
+
+        # Small delay before pressing Enter
+        await page.wait_for_timeout(1000)
+
+        try:
+            # Re-get the password element to ensure it's still attached
+            password_element = await page.wait_for_selector(
+                "input[name='passwd']",
+                timeout=5000,
+                state="visible"
+            )
+
+            if not password_element:
+                raise Exception("Password element not found before pressing Enter")
+
+            # Try to press Enter on the element
+            await password_element.press("Enter")
+            logger.debug("Pressed Enter on password field")
+
+        except Exception as e:
+            logger.error(f"Failed to press Enter on password field: {str(e)}")
+            # Try alternative method - keyboard press
+            try:
+                await page.keyboard.press("Enter")
+                logger.debug("Pressed Enter using keyboard")
+            except Exception as e2:
+                logger.error(f"Failed to press Enter using keyboard: {str(e2)}")
+                raise
+
+        # Wait for navigation/processing
+        try:
+            # Wait for URL change or new elements
+            await page.wait_for_function(
+                """() => {
+                    return document.querySelector('#idDiv_SAOTCS_Proofs') !== null || 
+                           document.querySelector('.error') !== null ||
+                           document.querySelector('#passwordError') !== null ||
+                           document.querySelector('[data-value="PhoneAppNotification"]') !== null ||
+                           document.querySelector('#idSIButton9') !== null
+                }""",
+                timeout=15000
+            )
+
+            # Add a small delay to let any animations complete
+            await page.wait_for_timeout(2000)
+
+            # Save the current page state for debugging
+            # content = await page.content()
+            # with open("after_password.html", "w", encoding="utf-8") as f:
+            #     f.write(content)
+            # await page.screenshot(path="after_password.png")
+
+            logger.debug("Password page processed successfully")
+        except Exception as e:
+            logger.error(f"Error after password submission: {str(e)}")
+            # Save the page state for debugging
+            # content = await page.content()
+            # with open("password_error.html", "w", encoding="utf-8") as f:
+            #     f.write(content)
+            # await page.screenshot(path="password_error.png")
+            raise
+
+        logger.debug("Waiting for phone authentication")
+
+        try:
+            # Add a longer delay after password entry to let the page fully load
+            await page.wait_for_timeout(5000)
+
+            # Try to find any verification/authentication related elements
+            verification_selectors = [
+                "#idDiv_SAOTCS_Proofs",
+                "[data-bind*='phoneAppNotification']",
+                "[data-value='PhoneAppNotification']",
+                "input[aria-label*='Notification']",
+                "input[aria-label*='notification']",
+                "div[data-value*='Phone']",
+                "#idDiv_SAOTCC_Section",
+                "[role='radiogroup']"
+            ]
+
+            # Log the current page state
+            # content = await page.content()
+            # with open("verification_page.html", "w", encoding="utf-8") as f:
+            #     f.write(content)
+            # await page.screenshot(path="verification_page.png")
+
+            # Try each selector
+            phone_auth_element = None
+            for selector in verification_selectors:
+                try:
+                    logger.debug(f"Trying to find element with selector: {selector}")
+                    element = await page.wait_for_selector(selector, timeout=3000, state="visible")
+                    if element:
+                        # Check if this is a container or the actual element
+                        if await element.evaluate('el => el.tagName === "DIV"'):
+                            # If it's a container, look for the phone option inside it
+                            possible_elements = await element.query_selector_all('input[type="radio"], div[role="button"], button')
+                            for possible in possible_elements:
+                                html = await possible.evaluate('el => el.outerHTML')
+                                logger.debug(f"Found possible element: {html}")
+                                if any(keyword in html.lower() for keyword in ['phone', 'notification', 'mobil']):
+                                    phone_auth_element = possible
+                                    break
+                        else:
+                            phone_auth_element = element
+
+                        if phone_auth_element:
+                            logger.debug("Found phone authentication element")
+                            break
+                except Exception as e:
+                    logger.debug(f"Selector {selector} failed: {str(e)}")
+                    continue
+
+            if not phone_auth_element:
+                # Try an alternative approach - look for any clickable elements
+                logger.debug("Trying alternative approach to find authentication element")
+                elements = await page.query_selector_all('input[type="radio"], div[role="button"], button')
+                for element in elements:
+                    try:
+                        html = await element.evaluate('el => el.outerHTML')
+                        text = await element.evaluate('el => el.textContent || el.value || el.getAttribute("aria-label") || ""')
+                        logger.debug(f"Found element: {text} with HTML: {html}")
+                        if any(keyword in (html + text).lower() for keyword in ['phone', 'notification', 'mobil', 'authenticator']):
+                            phone_auth_element = element
+                            logger.debug(f"Found authentication element with text: {text}")
+                            break
+                    except Exception as e:
+                        logger.debug(f"Error checking element: {str(e)}")
+                        continue
+
+            if not phone_auth_element:
+                logger.error("Failed to find phone authentication element")
+                raise Exception("Failed to find phone authentication element")
+
+            # Add a delay before clicking
+            await page.wait_for_timeout(1000)
+
+            # Try to click the element
+            try:
+                await phone_auth_element.click()
+                logger.debug("Successfully clicked phone authentication element")
+            except Exception as e:
+                logger.error(f"Failed to click element: {str(e)}")
+                # Try JavaScript click as fallback
+                await page.evaluate('element => element.click()', phone_auth_element)
+                logger.debug("Clicked element using JavaScript")
+
+        except Exception as e:
+            logger.error(f"Error during phone authentication: {str(e)}")
+            # Save debug info
+            # await page.screenshot(path="auth_error.png")
+            # content = await page.content()
+            # with open("auth_error.html", "w", encoding="utf-8") as f:
+            #     f.write(content)
+            raise
+
+        logger.debug("Waiting for authentication number")
+        auth_number_element = await page.wait_for_selector(
+            ".display-sign-container", timeout=60000
+        )
+
+        if not auth_number_element:
+            logger.error("Failed to find authentication number element")
+            raise Exception("Failed to find authentication number element")
+
+        auth_number = await auth_number_element.text_content()
+
+        if not auth_number:
+            logger.error("Failed to get authentication number")
+            raise Exception("Failed to get authentication number")
+
+        auth_number = auth_number.replace(" ", "").replace("\n", "")
+
+        logger.debug(f"Authentication number received: {auth_number}")
+
+        print(
+            (
+                f"\n{"=" * 50}"
+                f"\nAUTHENTICATION NUMBER: {auth_number}"
+                f"\nPlease enter this number in your phone app"
+                f"\n{"=" * 50}"
+            )
+        )
+
+        logger.debug("Waiting for stay signed in option")
+        stay_signed_in_element = await page.wait_for_selector(
+            "input[type='submit']"
+        )
+
+        if not stay_signed_in_element:
+            logger.error("Failed to find stay signed in element")
+            raise Exception("Failed to find stay signed in element")
+
+        await stay_signed_in_element.click()
+
+        logger.debug("Waiting for redirect to main page")
+        await page.wait_for_url(
+            "https://coopcrmprod.crm4.dynamics.com/main.aspx?forceUCI=1&pagetype=apps",
+            timeout=60000,
+        )
+
+    def start_background_refresh(
+        self,
+        refresh_margin: float = 900,
+        retry_interval: float = 60,
+        max_failures: int = 5,
+    ) -> None:
+        """
+        Renew the cookies in the background before they expire.
+
+        Only runs with a persistent browser profile (`user_data_dir`), where
+        the refresh is a warm session login. Without one a login goes through
+        credentials and the MFA number prompt, which needs a person, so the
+        refresh is disabled and an expired session is renewed by the next
+        request's login instead. It also needs an existing session.
+
+        Args:
+            refresh_margin (float): Seconds before the auth cookie expires at
+                which the login runs. Must be larger than the 5-minute buffer
+                in `is_authenticated` so requests never wait for a login.
+            retry_interval (float): Seconds before the first retry of a failed
+                refresh, doubled after every further failure.
+            max_failures (int): Failed refreshes in a row before giving up.
+        """
+        if self._refresh_task and not self._refresh_task.done():
+            return
+
+        if not self._user_data_dir:
+            logger.info(
+                "Background refresh disabled without a persistent browser profile, "
+                "expired sessions are renewed on the next request"
+            )
+            return
+
+        if not self.expires_at:
+            logger.warning("No session to keep alive, background refresh not started")
+            return
+
+        self._refresh_task = asyncio.create_task(
+            self._refresh_loop(refresh_margin, retry_interval, max_failures)
+        )
+
+    def stop_background_refresh(self) -> None:
+        if self._refresh_task:
+            _ = self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def _refresh_loop(
+        self, refresh_margin: float, retry_interval: float, max_failures: int
+    ) -> None:
+        failures = 0
+
+        while True:
+            expires = self.expires_at
+            if not expires:
+                logger.warning("Session is gone, stopping background refresh")
+                return
+
+            delay = expires - refresh_margin - time.time()
+            if delay > 0:
+                logger.debug(f"Next background login in {delay:.0f}s")
+                await asyncio.sleep(delay)
+
+            # Another process may already have renewed the cookies file
+            if self.reload_if_changed() and self.expires_at != expires:
+                failures = 0
+                continue
+
+            try:
+                logger.info("Refreshing authentication in the background")
+                _ = await self.login(force=True, session_only=True)
+            except Exception as e:
+                logger.error(f"Background authentication refresh failed: {e}")
+
+            if self.expires_at and self.expires_at != expires:
+                failures = 0
+                continue
+
+            # The login didn't produce fresh cookies, back off exponentially
+            failures += 1
+            if failures >= max_failures:
+                logger.error(
+                    f"Background authentication refresh failed {failures} times "
+                    "in a row, giving up"
+                )
+                return
+
+            backoff = retry_interval * 2 ** (failures - 1)
+            logger.warning(f"Retrying background authentication in {backoff:.0f}s")
+            await asyncio.sleep(backoff)
+
     def logout(self):
+        self.stop_background_refresh()
         self._user = None
-        self._cookies = {}
+        self._set_cookies({})
         return self
 
+    def _set_cookies(self, cookies: dict[str, Cookie]) -> None:
+        """Replace the cookie set and compute its validity once."""
+        self._cookies = cookies
+        self._cookies_version += 1
+
+        auth_cookie = cookies.get("CrmOwinAuth")
+        self._expires_at = auth_cookie.expires if auth_cookie else None
+        self._valid_until = (
+            self._expires_at - self._expiry_buffer if self._expires_at else 0.0
+        )
+
+    @property
+    def cookies_version(self) -> int:
+        """Incremented every time the cookie set is replaced."""
+        return self._cookies_version
+
+    @property
+    def expires_at(self) -> float | None:
+        """Expiry timestamp of the CrmOwinAuth cookie, if any."""
+        return self._expires_at
+
     def cookies_as_tuples(self):
         return [(c.name, c.value) for c in self._cookies.values()]
 
+    def _cookie_file_mtime(self) -> float | None:
+        try:
+            return os.stat(self._cookie_file_path).st_mtime
+        except FileNotFoundError:
+            return None
+
     def save_cookies(self):
         """
         Save current cookies to the cookies file.
+
+        The file is written to a temporary file and renamed into place so
+        other processes never read a half-written file.
         """
-        with open(self._cookie_file_path, "w") as f:
-            json.dump(
-                {c.name: c.to_json() for c in self._cookies.values()},
-                f,
-                indent=4,
-            )
+        directory = os.path.dirname(self._cookie_file_path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".cookies.", suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(
+                    {c.name: c.to_json() for c in self._cookies.values()},
+                    f,
+                    indent=4,
+                )
+            os.replace(tmp_path, self._cookie_file_path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+        self._cookie_file_loaded_mtime = self._cookie_file_mtime()
 
     def load_cookies(self):
         """
         Load cookies from the cookies file.
         """
-        if os.path.exists(self._cookie_file_path):
+        mtime = self._cookie_file_mtime()
+        if mtime is not None:
             with open(self._cookie_file_path, "r") as f:
                 data: dict[str, Any] = json.load(f)
-                self._cookies = {c: Cookie.from_json(data[c]) for c in data}
+                self._set_cookies({c: Cookie.from_json(data[c]) for c in data})
+            self._cookie_file_loaded_mtime = mtime
         return self
 
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the cookies file if another process has rewritten it.
+
+        Returns:
+            bool: True if new cookies were loaded.
+        """
+        mtime = self._cookie_file_mtime()
+        if mtime is None or mtime == self._cookie_file_loaded_mtime:
+            return False
+
+        logger.debug("Cookies file changed on disk, reloading")
+        _ = self.load_cookies()
+        return True
+
     @property
     def cookies(self):
         return self._cookies
@@ -425,21 +712,15 @@ class Authenticate:
         """
         Check if we have valid authentication.
         Includes a 5-minute buffer before expiration to prevent edge cases.
-        """
-        if not self.cookies:
-            logger.debug("No cookies found, attempting to load from file")
-            _ = self.load_cookies()
 
-        auth_cookie = self.cookies.get("CrmOwinAuth")
-        if not auth_cookie or not auth_cookie.expires:
-            logger.debug("No valid auth cookie found")
-            return False
-
-        buffer_time = 300
-        current_time = time.time()
+        The validity is computed once per cookie set, so the check is a single
+        comparison. Only when it fails is the cookies file checked for a
+        refresh made by another process.
+        """
+        if time.time() < self._valid_until:
+            return True
 
-        if auth_cookie.expires - current_time <= buffer_time:
-            logger.debug("Auth cookie is expired or will expire soon")
-            return False
+        if self.reload_if_changed():
+            return time.time() < self._valid_until
 
-        return True
+        return False
@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import json
+import uuid
+from asyncio import gather
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Literal
+
+from httpx import QueryParams
+from httpx._types import QueryParamTypes
+
+from app.logger import logger
+
+if TYPE_CHECKING:
+    from packages.crm.api import CrmApi
+
+
+BatchMethod = Literal["GET", "POST", "PATCH", "PUT", "DELETE"]
+
+# Dataverse rejects $batch requests with more than 1000 operations
+MAX_BATCH_OPERATIONS = 1000
+
+
+@dataclass
+class BatchRequest:
+    """A single operation inside a $batch request."""
+
+    method: BatchMethod
+    endpoint: str
+    data: dict[str, Any] | None = None
+    parameters: QueryParamTypes | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+    content_id: int = 0
+
+
+@dataclass
+class BatchResult:
+    """The outcome of a single operation inside a $batch request."""
+
+    request: BatchRequest
+    status_code: int
+    headers: dict[str, str] = field(default_factory=dict)
+    text: str = ""
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status_code < 300
+
+    def json(self) -> Any:
+        return json.loads(self.text) if self.text else None
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise Exception(
+                f"Batch operation {self.request.method} {self.request.endpoint} "
+                f"failed: {self.status_code} {self.error or self.text}"
+            )
+
+
+@dataclass
+class ChangeSet:
+    """A group of operations that Dataverse executes atomically."""
+
+    batch: "CrmBatch"
+    requests: list[BatchRequest] = field(default_factory=list)
+
+    def _add(self, request: BatchRequest) -> BatchRequest:
+        request.content_id = self.batch._next_content_id()
+        self.requests.append(request)
+        self.batch.requests.append(request)
+        return request
+
+    def post(
+        self,
+        endpoint: str,
+        data: dict[str, Any],
+        headers: dict[str, str] | None = None,
+    ) -> BatchRequest:
+        return self._add(BatchRequest("POST", endpoint, data, headers=headers or {}))
+
+    def patch(
+        self,
+        endpoint: str,
+        data: dict[str, Any],
+        headers: dict[str, str] | None = None,
+    ) -> BatchRequest:
+        return self._add(
+            BatchRequest(
+                "PATCH",
+                endpoint,
+                data,
+                headers=headers or {"mscrm.suppressduplicatedetection": "false"},
+            )
+        )
+
+    def delete(self, endpoint: str) -> BatchRequest:
+        return self._add(BatchRequest("DELETE", endpoint))
+
+
+BatchItem = BatchRequest | ChangeSet
+
+
+class CrmBatch:
+    """
+    Collects operations and sends them as OData $batch requests.
+
+    Write operations are grouped in change sets, GET requests are sent
+    outside of change sets. Operations are split over as many $batch
+    requests as needed to stay below `max_operations` per request, without
+    ever splitting a change set.
+
+    Example:
+        async with api.batch() as batch:
+            changeset = batch.changeset()
+            changeset.patch("incidents(<id>)", {"title": "New title"})
+            changeset.post("CloseIncident", {...})
+
+        for result in batch.results:
+            result.raise_for_status()
+    """
+
+    _api: "CrmApi"
+    _items: list[BatchItem]
+    _content_id: int
+    max_operations: int
+    requests: list[BatchRequest]
+    results: list[BatchResult]
+
+    def __init__(self, api: "CrmApi", max_operations: int = MAX_BATCH_OPERATIONS):
+        self._api = api
+        self._items = []
+        self._content_id = 0
+        self.max_operations = min(max_operations, MAX_BATCH_OPERATIONS)
+        self.requests = []
+        self.results = []
+
+    async def __aenter__(self) -> "CrmBatch":
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is None:
+            _ = await self.execute()
+
+    def _next_content_id(self) -> int:
+        self._content_id += 1
+        return self._content_id
+
+    def changeset(self) -> ChangeSet:
+        """Start a new change set and add it to the batch."""
+        changeset = ChangeSet(batch=self)
+        self._items.append(changeset)
+        return changeset
+
+    def get(
+        self,
+        endpoint: str,
+        parameters: QueryParamTypes | None = None,
+    ) -> BatchRequest:
+        """Add a GET request outside of any change set."""
+        request = BatchRequest("GET", endpoint, parameters=parameters)
+        request.content_id = self._next_content_id()
+        self._items.append(request)
+        self.requests.append(request)
+        return request
+
+    def _chunks(self) -> list[list[BatchItem]]:
+        """Split the batch items into chunks that fit in a single $batch request."""
+        chunks: list[list[BatchItem]] = []
+        current: list[BatchItem] = []
+        size = 0
+
+        for item in self._items:
+            item_size = len(item.requests) if isinstance(item, ChangeSet) else 1
+            if item_size == 0:
+                continue
+            if current and size + item_size > self.max_operations:
+                chunks.append(current)
+                current, size = [], 0
+            current.append(item)
+            size += item_size
+
+        if current:
+            chunks.append(current)
+
+        return chunks
+
+    async def execute(self) -> list[BatchResult]:
+        """
+        Send all collected operations.
+
+        Returns:
+            list[BatchResult]: One result per operation, in the order the
+            operations were added. Failed operations get a result with
+            `ok == False` instead of raising.
+        """
+        chunks = self._chunks()
+
+        logger.debug(
+            f"Executing batch with {len(self.requests)} operations in {len(chunks)} requests"
+        )
+
+        chunk_results = await gather(
+            *(self._execute_chunk(chunk) for chunk in chunks),
+            return_exceptions=True,
+        )
+
+        by_content_id: dict[int, BatchResult] = {}
+        for chunk, result in zip(chunks, chunk_results):
+            if isinstance(result, BaseException):
+                logger.error(f"Batch request failed: {result}")
+                for request in _chunk_requests(chunk):
+                    by_content_id[request.content_id] = BatchResult(
+                        request=request, status_code=0, error=str(result)
+                    )
+                continue
+            for item in result:
+                by_content_id[item.request.content_id] = item
+
+        self.results = [by_content_id[r.content_id] for r in self.requests]
+        return self.results
+
+    async def _execute_chunk(self, chunk: list[BatchItem]) -> list[BatchResult]:
+        boundary = f"batch_{uuid.uuid4()}"
+        body = self._build_body(chunk, boundary)
+
+        response = await self._api.request(
+            method="POST",
+            path=f"{self._api.api_data_endpoint}/$batch",
+            headers={
+                "Content-Type": f"multipart/mixed; boundary={boundary}",
+                "Accept": "application/json",
+                "Prefer": "odata.continue-on-error",
+            },
+            content=body.encode("utf-8"),
+        )
+
+        parts = _parse_multipart(
+            response.text, _boundary(response.headers.get("content-type", ""))
+        )
+
+        return _map_results(chunk, parts)
+
+    def _build_body(self, chunk: list[BatchItem], boundary: str) -> str:
+        lines: list[str] = []
+
+        for item in chunk:
+            lines.append(f"--{boundary}")
+            if isinstance(item, ChangeSet):
+                changeset_boundary = f"changeset_{uuid.uuid4()}"
+                lines += [
+                    f"Content-Type: multipart/mixed; boundary={changeset_boundary}",
+                    "",
+                ]
+                for request in item.requests:
+                    lines.append(f"--{changeset_boundary}")
+                    lines += self._request_lines(request)
+                lines.append(f"--{changeset_boundary}--")
+            else:
+                lines += self._request_lines(item)
+
+        lines.append(f"--{boundary}--")
+        lines.append("")
+
+        return "\r\n".join(lines)
+
+    def _request_lines(self, request: BatchRequest) -> list[str]:
+        url = f"{self._api.base_url}/{self._api.api_data_endpoint}/{request.endpoint}"
+        if request.parameters:
+            url = f"{url}?{QueryParams(request.parameters)}"
+
+        lines = [
+            "Content-Type: application/http",
+            "Content-Transfer-Encoding: binary",
+            f"Content-ID: {request.content_id}",
+            "",
+            f"{request.method} {url} HTTP/1.1",
+        ]
+
+        if request.data is not None:
+            lines.append("Content-Type: application/json;type=entry")
+        else:
+            lines.append("Accept: application/json")
+
+        lines += [f"{k}: {v}" for k, v in request.headers.items()]
+        lines.append("")
+        lines.append(json.dumps(request.data) if request.data is not None else "")
+
+        return lines
+
+
+def _chunk_requests(chunk: list[BatchItem]) -> list[BatchRequest]:
+    return [
+        request
+        for item in chunk
+        for request in (item.requests if isinstance(item, ChangeSet) else [item])
+    ]
+
+
+def _boundary(content_type: str) -> str:
+    for param in content_type.split(";"):
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "boundary":
+            return value.strip('"')
+    raise ValueError(f"No boundary in batch response content type: {content_type}")
+
+
+def _parse_headers(block: str) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    for line in block.split("\n"):
+        key, sep, value = line.partition(":")
+        if sep:
+            headers[key.strip().lower()] = value.strip()
+    return headers
+
+
+@dataclass
+class _Part:
+    headers: dict[str, str]
+    body: str
+
+
+def _parse_multipart(body: str, boundary: str) -> list[_Part]:
+    """Split a multipart/mixed body into its parts."""
+    body = body.replace("\r\n", "\n")
+    parts: list[_Part] = []
+
+    for chunk in body.split(f"--{boundary}")[1:]:
+        if chunk.startswith("--"):
+            break
+        head, _, content = chunk.lstrip("\n").partition("\n\n")
+        parts.append(_Part(headers=_parse_headers(head), body=content.rstrip("\n")))
+
+    return parts
+
+
+def _parse_http(request: BatchRequest, part: _Part) -> BatchResult:
+    """Parse an application/http part into a BatchResult."""
+    status_line, _, rest = part.body.partition("\n")
+    head, _, text = rest.partition("\n\n")
+
+    try:
+        status_code = int(status_line.split()[1])
+    except (IndexError, ValueError):
+        return BatchResult(
+            request=request,
+            status_code=0,
+            error=f"Malformed batch response: {status_line}",
+        )
+
+    result = BatchResult(
+        request=request,
+        status_code=status_code,
+        headers=_parse_headers(head),
+        text=text.strip(),
+    )
+
+    if status_code >= 400:
+        try:
+            result.error = result.json()["error"]["message"]
+        except (ValueError, KeyError, TypeError):
+            result.error = result.text or status_line
+
+    return result
+
+
+def _map_results(chunk: list[BatchItem], parts: list[_Part]) -> list[BatchResult]:
+    """Match response parts to the operations of a chunk."""
+    results: list[BatchResult] = []
+
+    for index, item in enumerate(chunk):
+        requests = item.requests if isinstance(item, ChangeSet) else [item]
+
+        if index >= len(parts):
+            results += [
+                BatchResult(
+                    request=r, status_code=0, error="No response returned for operation"
+                )
+                for r in requests
+            ]
+            continue
+
+        part = parts[index]
+        content_type = part.headers.get("content-type", "")
+
+        if not content_type.startswith("multipart/mixed"):
+            # A failed change set is answered with a single error response
+            results += [_parse_http(r, part) for r in requests]
+            continue
+
+        nested = _parse_multipart(part.body, _boundary(content_type))
+        by_content_id = {p.headers.get("content-id"): p for p in nested}
+
+        for position, request in enumerate(requests):
+            nested_part = by_content_id.get(str(request.content_id))
+            if nested_part is None and position < len(nested):
+                nested_part = nested[position]
+            if nested_part is None:
+                results.append(
+                    BatchResult(
+                        request=request,
+                        status_code=0,
+                        error="No response returned for operation",
+                    )
+                )
+                continue
+            results.append(_parse_http(request, nested_part))
+
+    return results
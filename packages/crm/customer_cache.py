@@ -0,0 +1,111 @@
+import asyncio
+
+from app.logger import logger
+from packages.crm.actions import ActionDataResponse, get_customer_by_personal_number
+from packages.crm.api import CrmApi
+from packages.utils.cache import SqliteCache, TTLCache
+from packages.utils.extract_data import normalize_personal_number
+
+
+class CustomerLookupCache:
+    """
+    Cache for get_customer_by_personal_number, keyed by normalized personnummer.
+
+    Only the cache key is normalized, the CRM is asked with the personnummer
+    as given.
+
+    Lookups are served from an in-memory TTL/LRU cache, then from an optional
+    SQLite cache shared between runs, and only then from the CRM. The SQLite
+    cache stores customer data unencrypted, so it is off unless a db_path is
+    given. Concurrent
+    lookups of the same personnummer share a single request. "Not a customer"
+    answers are kept for a shorter time than found customers, since those
+    people may sign up at any moment. Failed lookups are never cached.
+
+    Example:
+        cache = CustomerLookupCache(db_path="app/data/customer_cache.db")
+        response = await cache.lookup("199001011234", api)
+    """
+
+    ttl: float
+    not_found_ttl: float
+    _memory: TTLCache[str, ActionDataResponse]
+    _disk: SqliteCache | None
+    _in_flight: dict[str, "asyncio.Task[ActionDataResponse]"]
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl: float = 24 * 60 * 60,
+        not_found_ttl: float = 60 * 60,
+        db_path: str | None = None,
+    ) -> None:
+        """
+        Args:
+            maxsize: Entries kept in memory.
+            ttl: Seconds a found customer is cached.
+            not_found_ttl: Seconds a "not a customer" answer is cached.
+            db_path: SQLite file for a cache that survives between runs.
+        """
+        self.ttl = ttl
+        self.not_found_ttl = not_found_ttl
+        self._memory = TTLCache(maxsize=maxsize)
+        self._disk = SqliteCache(db_path, table="customer_lookups") if db_path else None
+        self._in_flight = {}
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {**self._memory.stats, "in_flight": len(self._in_flight)}
+
+    async def lookup(self, personal_number: str, api: CrmApi) -> ActionDataResponse:
+        """Look up a customer, using the cache when possible."""
+        key = normalize_personal_number(personal_number)
+
+        cached = self._memory.get(key)
+        if cached is not None:
+            return cached
+
+        if self._disk:
+            stored = self._disk.get(key)
+            if stored is not None:
+                response = ActionDataResponse.model_validate_json(stored)
+                self._memory.set(key, response, self._ttl_for(response))
+                return response
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, personal_number, api))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            logger.debug(f"Joining in-flight customer lookup for {key}")
+
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self, key: str, personal_number: str, api: CrmApi
+    ) -> ActionDataResponse:
+        response = await get_customer_by_personal_number(personal_number, api)
+        ttl = self._ttl_for(response)
+
+        self._memory.set(key, response, ttl)
+        if self._disk:
+            self._disk.set(key, response.model_dump_json(), ttl)
+
+        return response
+
+    def _ttl_for(self, response: ActionDataResponse) -> float:
+        return self.not_found_ttl if response.is_not_customer() else self.ttl
+
+    def invalidate(self, personal_number: str) -> None:
+        """Forget a customer, e.g. after creating a membership for them."""
+        key = normalize_personal_number(personal_number)
+        self._memory.delete(key)
+        if self._disk:
+            self._disk.delete(key)
+
+    def close(self) -> None:
+        """Close the SQLite connection, if the cache has one."""
+        if self._disk:
+            self._disk.close()
+            self._disk = None
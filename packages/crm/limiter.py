@@ -0,0 +1,201 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from httpx import Headers
+
+from app.logger import logger
+
+
+# Dataverse answers 429 when a service protection limit is hit and 503 when
+# the server is too busy. Both carry a Retry-After header.
+THROTTLE_STATUS_CODES = (429, 503)
+
+# A 429 is returned before the request is processed, so any request can be
+# resent. A 503 may come after a write went through, so only these are
+# retried on it.
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "PUT", "DELETE"))
+
+
+def is_retryable(status_code: int, method: str) -> bool:
+    """Whether a throttled request can be sent again without side effects."""
+    return status_code == 429 or (
+        status_code in THROTTLE_STATUS_CODES and method.upper() in IDEMPOTENT_METHODS
+    )
+
+
+def retry_after_seconds(headers: Headers, attempt: int, max_delay: float = 300) -> float:
+    """
+    Read how long to wait from a Retry-After header.
+
+    Args:
+        headers: Response headers.
+        attempt: Zero based retry attempt, used for exponential backoff when
+            the header is missing or invalid.
+        max_delay: Upper bound of the returned delay.
+
+    Returns:
+        float: Seconds to wait before retrying.
+    """
+    value = headers.get("Retry-After")
+    delay: float | None = None
+
+    if value:
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(value)
+                delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                delay = None
+
+    if delay is None:
+        delay = float(2**attempt)
+
+    return min(max(delay, 0.0), max_delay)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter.
+
+    The number of requests allowed in flight grows by one per round of
+    successful requests and is cut multiplicatively when the server throttles
+    (429/503) or when latency climbs well above its baseline. A throttle also
+    pauses new requests until the server's Retry-After has passed.
+
+    Latency is tracked per request class (e.g. the HTTP method), so slow
+    writes aren't compared with fast reads. The baseline follows the lowest
+    latency seen but drifts back up towards the smoothed latency, so one
+    unusually fast response can't mark everything after it as congested.
+    """
+
+    min_limit: int
+    max_limit: int
+    throttle_backoff: float
+    latency_backoff: float
+    latency_tolerance: float
+    smoothing: float
+    baseline_drift: float
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        throttle_backoff: float = 0.5,
+        latency_backoff: float = 0.9,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.2,
+        baseline_drift: float = 0.01,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.throttle_backoff = throttle_backoff
+        self.latency_backoff = latency_backoff
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.baseline_drift = baseline_drift
+
+        self._limit: float = float(initial_limit)
+        self._in_flight: int = 0
+        self._condition = asyncio.Condition()
+        self._paused_until: float = 0.0
+        # Smoothed and baseline latency per request class
+        self._latency: dict[str, float] = {}
+        self._baseline_latency: dict[str, float] = {}
+        self._last_decrease: float = 0.0
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        while True:
+            while (delay := self._paused_until - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+
+            async with self._condition:
+                _ = await self._condition.wait_for(
+                    lambda: self._in_flight < self.limit
+                )
+                # A throttle may have started while waiting for a free slot
+                if self._paused_until <= time.monotonic():
+                    self._in_flight += 1
+                    return
+
+    async def release(self) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the duration of the block."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+    def _decrease(self, factor: float) -> None:
+        self._limit = max(float(self.min_limit), self._limit * factor)
+        self._last_decrease = time.monotonic()
+
+    def record_success(
+        self, latency: float | None, request_class: str = "default"
+    ) -> None:
+        """
+        Feed back a request that was not throttled.
+
+        Args:
+            latency: Seconds the request took, None to leave it out of the
+                latency signal (e.g. $batch requests, whose latency depends
+                on the number of operations).
+            request_class: Requests whose latencies are comparable.
+        """
+        congested = False
+
+        if latency is not None:
+            smoothed = self._latency.get(request_class)
+            baseline = self._baseline_latency.get(request_class)
+            if smoothed is None or baseline is None:
+                smoothed = baseline = latency
+            else:
+                smoothed += self.smoothing * (latency - smoothed)
+                baseline += self.baseline_drift * (smoothed - baseline)
+                baseline = min(baseline, latency)
+            self._latency[request_class] = smoothed
+            self._baseline_latency[request_class] = baseline
+
+            congested = smoothed > baseline * self.latency_tolerance
+
+        if congested:
+            # Decrease at most once per observed round trip
+            if time.monotonic() - self._last_decrease > smoothed:
+                self._decrease(self.latency_backoff)
+                logger.debug(
+                    f"{request_class} latency {smoothed:.2f}s above baseline "
+                    f"{baseline:.2f}s, concurrency limit {self.limit}"
+                )
+        elif self._limit < self.max_limit:
+            self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+
+    def record_throttle(self, retry_after: float) -> None:
+        """Feed back a throttled request and pause until Retry-After has passed."""
+        # Requests that were already in flight when the first throttle hit
+        # answer with 429 as well, only back off once per pause
+        if time.monotonic() >= self._paused_until:
+            self._decrease(self.throttle_backoff)
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        logger.warning(
+            f"Throttled by server, pausing {retry_after:.1f}s with concurrency limit {self.limit}"
+        )
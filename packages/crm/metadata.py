@@ -0,0 +1,81 @@
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from typing import Any, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, create_model
+
+# Python types for the primitive Edm types of an entity's properties.
+# Guids, dates and binaries are kept as strings: Excel can't store timezone
+# aware datetimes and the values are exported as the Web API returns them.
+EDM_TYPES: dict[str, type] = {
+    "Edm.String": str,
+    "Edm.Guid": str,
+    "Edm.Boolean": bool,
+    "Edm.Int32": int,
+    "Edm.Int64": int,
+    "Edm.Decimal": float,
+    "Edm.Double": float,
+    "Edm.DateTimeOffset": str,
+    "Edm.Date": str,
+    "Edm.Binary": str,
+}
+
+
+def entity_properties(path: str) -> list[tuple[str, str]]:
+    """
+    Read the primitive properties of an entity from its metadata file.
+
+    Navigation properties and complex types are skipped.
+
+    Args:
+        path: EntityType XML, e.g. meta/Incident.xml.
+
+    Returns:
+        list: (property name, Edm type) pairs in metadata order.
+    """
+    root = ET.parse(path).getroot()
+    return [
+        (prop.get("Name", ""), prop.get("Type", ""))
+        for prop in root.iter("Property")
+        if prop.get("Type") in EDM_TYPES
+    ]
+
+
+@lru_cache(maxsize=None)
+def entity_model(path: str, name: str | None = None) -> type[BaseModel]:
+    """
+    Build a Pydantic model with every primitive property of an entity.
+
+    All fields are optional. Lookup properties such as `_ownerid_value` are
+    exposed without the leading underscore, which Pydantic reserves, and
+    keep the property name as alias. The model works with OData.from_model
+    for the $select and with TypedWorkSheet for wide entity snapshots.
+
+    Example:
+        IncidentSnapshot = entity_model("meta/Incident.xml")
+        query = OData.from_model("incident", IncidentSnapshot)
+
+    Args:
+        path: EntityType XML, e.g. meta/Incident.xml.
+        name: Model name, defaults to the entity name with a Snapshot suffix.
+
+    Returns:
+        type[BaseModel]: The model class, cached per path and name.
+    """
+    root = ET.parse(path).getroot()
+    entity = root.get("Name", "entity")
+    name = name or f"{entity[:1].upper()}{entity[1:]}Snapshot"
+
+    fields: dict[str, Any] = {
+        prop.lstrip("_"): (
+            Optional[EDM_TYPES[edm_type]],
+            Field(default=None, alias=prop),
+        )
+        for prop, edm_type in entity_properties(path)
+    }
+
+    return create_model(
+        name,
+        __config__=ConfigDict(populate_by_name=True, extra="ignore"),
+        **fields,
+    )
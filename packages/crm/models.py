@@ -1,7 +1,7 @@
 from typing import Generic, TypeVar
 from pydantic import BaseModel, field_validator, Field, ConfigDict
 from packages.crm.types import SubjectType
-from packages.utils.html_parser import IncidentHtmlDescriptionParser
+from packages.utils.description_cache import parse_description
 from dataclasses import asdict, dataclass
 from typing import Any
 from typing import Optional
@@ -13,6 +13,11 @@ T = TypeVar("T")
 
 class ODataResponse(BaseModel, Generic[T]):
     value: list[T]
+    next_link: Optional[str] = Field(alias="@odata.nextLink", default=None)
+    delta_link: Optional[str] = Field(alias="@odata.deltaLink", default=None)
+    count: Optional[int] = Field(alias="@odata.count", default=None)
+
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class Contact(BaseModel):
@@ -34,10 +39,10 @@ class Incident(BaseModel):
     @field_validator("description", mode="after")
     @classmethod
     def parse_html_description(cls, value: Optional[str]) -> Optional[str]:
-        """Parse HTML description using IncidentHtmlDescriptionParser."""
+        """Parse HTML description, memoized by content hash."""
         if value is None:
             return None
-        return IncidentHtmlDescriptionParser.parse_text(value)
+        return parse_description(value)
 
 
 class CreationFailureIncident(BaseModel):
@@ -48,11 +53,11 @@ class CreationFailureIncident(BaseModel):
     @field_validator("description", mode="after")
     @classmethod
     def parse_html_description(cls, value: str | None) -> str | None:
-        """Parse HTML description using IncidentHtmlDescriptionParser."""
+        """Parse HTML description, memoized by content hash."""
         # logger.debug(f"Parsing HTML description: {value}")
         if value is None:
             return None
-        return IncidentHtmlDescriptionParser.parse_text(value)
+        return parse_description(value)
 
 
 @dataclass
@@ -1,21 +1,131 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from functools import cached_property, lru_cache
+from typing import Any, get_args
+from uuid import UUID
+from pydantic import BaseModel
+from httpx import QueryParams
 from httpx._types import PrimitiveData
 
 
-@dataclass
+@dataclass(frozen=True)
 class OData:
+    """
+    Immutable, hashable OData query.
+
+    List arguments are stored as tuples, so equal queries hash equally and
+    their compiled parameters can be cached and reused.
+    """
+
     entity: str
     id: str | None = None
-    select: list[str] | None = None
-    filter: list[str] | None = None
-    orderby: list[str] | None = None
-    expand: list[OData] | None = None
+    select: tuple[str, ...] | None = None
+    filter: tuple[str, ...] | None = None
+    orderby: tuple[str, ...] | None = None
+    expand: tuple[OData, ...] | None = None
     top: int | None = None
+    skip: int | None = None
+    count: bool = False
+
+    def __post_init__(self) -> None:
+        for name in ("select", "filter", "orderby", "expand"):
+            value = getattr(self, name)
+            if value is not None and not isinstance(value, tuple):
+                object.__setattr__(self, name, tuple(value))
+
+    @classmethod
+    def from_model(cls, entity: str, model: type[BaseModel], **options: Any) -> OData:
+        """
+        Build a query whose $select and $expand match the fields of a model.
+
+        Field aliases are used as column names. Fields typed as a model (or a
+        list of models) become expands with their own derived $select.
+
+        Args:
+            entity: Entity (or navigation property) name.
+            model: Pydantic model the response is validated into.
+            **options: Any other OData field, e.g. filter, orderby or top.
+        """
+        select, expand = model_select(model)
+        return cls(entity=entity, select=select, expand=expand or None, **options)
+
+    @property
+    def endpoint(self) -> str:
+        """Entity set path, including the key when `id` is set."""
+        entity_set = f"{self.entity}s"
+        return f"{entity_set}({self.id})" if self.id else entity_set
+
+    @cached_property
+    def params(self) -> QueryParams:
+        """Compiled query parameters, built once per instance."""
+        return compile_odata_params(self)
+
+    @cached_property
+    def url(self) -> str:
+        """Endpoint and query string, ready to be appended to the API endpoint."""
+        query = str(self.params)
+        return f"{self.endpoint}?{query}" if query else self.endpoint
+
+
+def _nested_model(annotation: Any) -> type[BaseModel] | None:
+    """Find a model type inside an annotation like Optional[Model] or list[Model]."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        nested = _nested_model(arg)
+        if nested:
+            return nested
+    return None
+
 
+@lru_cache(maxsize=None)
+def model_select(model: type[BaseModel]) -> tuple[tuple[str, ...], tuple[OData, ...]]:
+    """
+    Derive the $select columns and $expand queries for a model.
 
-def compile_odata_params(odata: OData) -> list[tuple[str, PrimitiveData]]:
-    """Compile OData parameters into a list of tuples for httpx."""
+    Returns:
+        The selected column names and the expands for nested models.
+    """
+    select: list[str] = []
+    expand: list[OData] = []
+
+    for name, field in model.model_fields.items():
+        column = field.alias or name
+        nested = _nested_model(field.annotation)
+        if nested:
+            expand.append(OData.from_model(column, nested))
+        else:
+            select.append(column)
+
+    return tuple(select), tuple(expand)
+
+
+def literal(value: str | int | float | bool | UUID | datetime | date | None) -> str:
+    """
+    Format a Python value as an OData literal for use in $filter.
+
+    Strings are quoted with embedded single quotes doubled, so user data can
+    be put in a filter safely.
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+    if isinstance(value, date):
+        return value.isoformat()
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _compile(odata: OData) -> tuple[tuple[str, PrimitiveData], ...]:
     params: list[tuple[str, PrimitiveData]] = []
 
     if odata.select:
@@ -30,17 +140,31 @@ def compile_odata_params(odata: OData) -> list[tuple[str, PrimitiveData]]:
     if odata.top and odata.top > 0:
         params.append(("$top", str(odata.top)))
 
+    if odata.skip and odata.skip > 0:
+        params.append(("$skip", str(odata.skip)))
+
+    if odata.count:
+        params.append(("$count", "true"))
+
     if odata.expand:
         expand_parts: list[str] = []
 
         for expand in odata.expand:
-            nested_params = compile_odata_params(expand)
-            # Convert nested params to OData format
-            nested_str = ";".join(f"{k}={v}" for k, v in dict(nested_params).items())
-            if expand.entity:
-                expand_parts.append(f"{expand.entity}({nested_str})")
+            if not expand.entity:
+                continue
+            # Nested options are separated by ";" inside the parentheses
+            nested_str = ";".join(f"{k}={v}" for k, v in _compile(expand))
+            expand_parts.append(
+                f"{expand.entity}({nested_str})" if nested_str else expand.entity
+            )
 
         if expand_parts:
             params.append(("$expand", ",".join(expand_parts)))
 
-    return params
+    return tuple(params)
+
+
+@lru_cache(maxsize=256)
+def compile_odata_params(odata: OData) -> QueryParams:
+    """Compile OData parameters for httpx. Results are cached per query."""
+    return QueryParams(list(_compile(odata)))
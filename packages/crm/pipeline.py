@@ -0,0 +1,113 @@
+import asyncio
+import os
+from collections import deque
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor
+from typing import Any
+
+from app.logger import logger
+from packages.crm.Query import CRMQuery, UserQueriesMap
+from packages.crm.models import CreationFailureIncident
+from packages.utils.extract_data import ExtractedData, extract_many
+
+ParsedCreationFailure = tuple[CreationFailureIncident, ExtractedData]
+
+
+def parse_creation_failure_batch(
+    records: list[dict[str, Any]],
+) -> list[ParsedCreationFailure]:
+    """
+    Validate raw incident records and extract their description data.
+
+    Runs the HTML description parser (through the model validator) and the
+    key/value extraction. Defined at module level so it can be sent to a
+    process pool.
+
+    Args:
+        records: Raw incident records as returned by the Web API.
+
+    Returns:
+        list: (incident, extracted data) pairs in input order.
+    """
+    incidents = [CreationFailureIncident.model_validate(record) for record in records]
+    return list(
+        zip(
+            incidents,
+            extract_many(
+                (incident.description, incident.ticketnumber) for incident in incidents
+            ),
+        )
+    )
+
+
+async def iter_creation_failures(
+    query: CRMQuery,
+    executor: Executor | None = None,
+    batch_size: int = 256,
+    max_pending: int | None = None,
+    page_size: int | None = None,
+) -> AsyncIterator[ParsedCreationFailure]:
+    """
+    Stream parsed creation failure incidents from the saved view.
+
+    Pages are fetched as raw records and split into batches. Without an
+    executor the batches are parsed inline on the event loop. With one,
+    e.g. a ProcessPoolExecutor, the batches are parsed in parallel while the
+    next pages are downloaded.
+
+    Example:
+        with ProcessPoolExecutor() as executor:
+            async for incident, data in iter_creation_failures(q, executor):
+                ...
+
+    Args:
+        query: CRMQuery used to talk to the CRM.
+        executor: Executor the parsing runs in, None to parse inline.
+        batch_size: Records sent to the executor per task.
+        max_pending: Batches submitted but not yet yielded. Defaults to twice
+            the number of CPUs. Bounds memory when parsing is slower than
+            the network.
+        page_size: Records per page.
+
+    Yields:
+        (incident, extracted data) pairs in the order of the view.
+    """
+    if max_pending is None:
+        max_pending = 2 * (os.cpu_count() or 1)
+
+    loop = asyncio.get_running_loop()
+    pending: deque[asyncio.Future[list[ParsedCreationFailure]]] = deque()
+    submitted = 0
+
+    try:
+        async for page in query.iter_raw_pages(
+            "incidents",
+            [("userQuery", UserQueriesMap["creation_failure"])],
+            page_size=page_size,
+        ):
+            for start in range(0, len(page.value), batch_size):
+                batch = page.value[start : start + batch_size]
+
+                if executor is None:
+                    for parsed in parse_creation_failure_batch(batch):
+                        yield parsed
+                    continue
+
+                pending.append(
+                    loop.run_in_executor(executor, parse_creation_failure_batch, batch)
+                )
+                submitted += 1
+
+                while len(pending) >= max_pending:
+                    for parsed in await pending.popleft():
+                        yield parsed
+
+        while pending:
+            for parsed in await pending.popleft():
+                yield parsed
+    finally:
+        for future in pending:
+            _ = future.cancel()
+
+    if executor is not None:
+        logger.debug(f"Parsed creation failures in {submitted} executor batches")
@@ -0,0 +1,238 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Any
+
+import httpx
+
+from app.constants import COOP_NORRBOTTEN_ID, MEDLEMSSERVICE_ID, PRODUCTION_MACH1_ID
+from app.logger import logger
+from packages.crm.Query import CRMQuery
+from packages.crm.models import Incident, ODataResponse
+
+
+# Change tracking only supports $select, so filtering on team and state
+# happens locally. These columns are stored next to the raw record.
+INCIDENT_SYNC_COLUMNS = [
+    "incidentid",
+    "title",
+    "ticketnumber",
+    "description",
+    "statecode",
+    "createdon",
+    "modifiedon",
+    "_owningteam_value",
+    "_customerid_value",
+]
+
+EXCLUDED_CUSTOMER_IDS = (COOP_NORRBOTTEN_ID, PRODUCTION_MACH1_ID)
+
+
+def _lower(value: str | None) -> str | None:
+    # Guids come back lower case from the Web API but upper case in constants
+    return value.lower() if value else None
+
+
+class IncidentStore:
+    """
+    Local SQLite mirror of the incident entity set, keyed by incidentid.
+
+    The first sync downloads every incident with `Prefer: odata.track-changes`
+    and keeps the returned @odata.deltaLink. Later syncs only request the
+    delta link, which returns the records created, changed or deleted since.
+
+    The mirror holds customer data for the whole organisation, so it is only
+    used when INCIDENT_MIRROR_PATH is set.
+
+    Example:
+        store = IncidentStore()
+        await store.sync(CRMQuery(api))
+        latest = store.latest_incidents(top=10)
+    """
+
+    _db_path: str
+    _connection: sqlite3.Connection
+
+    def __init__(
+        self,
+        db_path: str = os.path.join(os.getcwd(), "app", "data", "incidents.db"),
+    ) -> None:
+        self._db_path = db_path
+        self._connection = sqlite3.connect(db_path)
+        _ = self._connection.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS incidents (
+                incidentid TEXT PRIMARY KEY,
+                owningteam TEXT,
+                customerid TEXT,
+                statecode INTEGER,
+                createdon TEXT,
+                modifiedon TEXT,
+                data TEXT NOT NULL,
+                synced_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS incidents_queue
+                ON incidents (owningteam, statecode, createdon);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                name TEXT PRIMARY KEY,
+                delta_link TEXT NOT NULL
+            );
+            """
+        )
+
+    def close(self) -> None:
+        self._connection.close()
+
+    @property
+    def delta_link(self) -> str | None:
+        row = self._connection.execute(
+            "SELECT delta_link FROM sync_state WHERE name = 'incidents'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def reset(self) -> None:
+        """Drop the mirror so the next sync downloads everything again."""
+        with self._connection:
+            _ = self._connection.execute("DELETE FROM incidents")
+            _ = self._connection.execute("DELETE FROM sync_state")
+
+    async def sync(self, query: CRMQuery, page_size: int = 5000) -> int:
+        """
+        Bring the mirror up to date.
+
+        Args:
+            query: CRMQuery used to talk to the CRM.
+            page_size: Records per page.
+
+        Returns:
+            int: Number of records upserted or deleted.
+        """
+        delta_link = self.delta_link
+
+        if delta_link:
+            endpoint, parameters = delta_link, None
+            logger.info("Syncing incidents from delta link")
+        else:
+            endpoint = "incidents"
+            parameters = [("$select", ",".join(INCIDENT_SYNC_COLUMNS))]
+            logger.info("No delta link stored, running full incident sync")
+
+        changed = 0
+        new_delta_link: str | None = None
+
+        try:
+            async for page in query.iter_raw_pages(
+                endpoint,
+                parameters,
+                page_size=page_size,
+                track_changes=True,
+            ):
+                changed += self._apply(page.value)
+                new_delta_link = page.delta_link or new_delta_link
+        except httpx.HTTPStatusError as e:
+            # Delta tokens expire, start over from a full sync
+            if delta_link and e.response.status_code in (400, 410):
+                logger.warning(f"Delta link rejected ({e.response.status_code}), resyncing")
+                self.reset()
+                return await self.sync(query, page_size=page_size)
+            raise
+
+        if new_delta_link:
+            with self._connection:
+                _ = self._connection.execute(
+                    "INSERT INTO sync_state (name, delta_link) VALUES ('incidents', ?) "
+                    "ON CONFLICT (name) DO UPDATE SET delta_link = excluded.delta_link",
+                    (new_delta_link,),
+                )
+        else:
+            logger.warning("Incident sync returned no delta link")
+
+        logger.info(f"Incident sync applied {changed} changes")
+        return changed
+
+    def _apply(self, records: list[dict[str, Any]]) -> int:
+        """Upsert changed records and delete removed ones in one transaction."""
+        now = time.time()
+        upserts: list[tuple[Any, ...]] = []
+        deletes: list[tuple[str]] = []
+
+        for record in records:
+            if str(record.get("@odata.context", "")).endswith("$deletedEntity"):
+                deletes.append((record["id"],))
+                continue
+
+            upserts.append(
+                (
+                    record["incidentid"],
+                    _lower(record.get("_owningteam_value")),
+                    _lower(record.get("_customerid_value")),
+                    record.get("statecode"),
+                    record.get("createdon"),
+                    record.get("modifiedon"),
+                    json.dumps(record, ensure_ascii=False),
+                    now,
+                )
+            )
+
+        with self._connection:
+            _ = self._connection.executemany(
+                """
+                INSERT INTO incidents (
+                    incidentid, owningteam, customerid, statecode,
+                    createdon, modifiedon, data, synced_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (incidentid) DO UPDATE SET
+                    owningteam = excluded.owningteam,
+                    customerid = excluded.customerid,
+                    statecode = excluded.statecode,
+                    createdon = excluded.createdon,
+                    modifiedon = excluded.modifiedon,
+                    data = excluded.data,
+                    synced_at = excluded.synced_at
+                """,
+                upserts,
+            )
+            _ = self._connection.executemany(
+                "DELETE FROM incidents WHERE incidentid = ?", deletes
+            )
+
+        return len(upserts) + len(deletes)
+
+    def latest_incidents(
+        self,
+        top: int = 10,
+        owning_team: str = MEDLEMSSERVICE_ID,
+    ) -> ODataResponse[Incident]:
+        """
+        Read the oldest open incidents of a team from the mirror.
+
+        Matches the filter of CRMQuery.get_latest_incident, except that the
+        customer contact is not expanded since change tracking can't expand.
+        """
+        placeholders = ",".join("?" for _ in EXCLUDED_CUSTOMER_IDS)
+        rows = self._connection.execute(
+            f"""
+            SELECT data FROM incidents
+            WHERE owningteam = ?
+                AND statecode = 0
+                AND (customerid IS NULL OR customerid NOT IN ({placeholders}))
+            ORDER BY createdon ASC
+            LIMIT ?
+            """,
+            (owning_team.lower(), *(i.lower() for i in EXCLUDED_CUSTOMER_IDS), top),
+        ).fetchall()
+
+        return ODataResponse[Incident](
+            value=[Incident.model_validate_json(row[0]) for row in rows]
+        )
+
+    def get_incident(self, incident_id: str) -> Incident | None:
+        row = self._connection.execute(
+            "SELECT data FROM incidents WHERE incidentid = ?", (incident_id,)
+        ).fetchone()
+        return Incident.model_validate_json(row[0]) if row else None
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT count(*) FROM incidents").fetchone()[0]
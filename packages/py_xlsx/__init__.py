@@ -17,11 +17,37 @@ Example:
     wb = Workbook()
     sheet = TypedWorkSheet(wb, Person)
     sheet.append(Person("John", 30))
+
+For large exports, StreamingTypedWorkSheet writes rows straight to disk:
+
+    with StreamingTypedWorkSheet("people.xlsx", Person) as sheet:
+        sheet.append(Person("John", 30))
+
+and TypedWorkSheetReader reads them back in bounded memory:
+
+    with TypedWorkSheetReader("people.xlsx", Person) as sheet:
+        for row in sheet.iter_records():
+            print(row.name)
+
+For analytics at scale, the sinks write the same models in batches to CSV,
+Parquet or Arrow IPC files (Parquet and Arrow need pyarrow):
+
+    with ParquetSink("people.parquet", Person) as sink:
+        sink.extend(people)
 """
 
-from .core.worksheet import TypedWorkSheet
+from .core.sinks import ArrowSink, CsvSink, ModelSink, ParquetSink
+from .core.worksheet import StreamingTypedWorkSheet, TypedWorkSheet, TypedWorkSheetReader
 # from .core.mail_merge import mail_merge_prelinked as mail_merge
 # from .core.mail_merge_vba import mail_merge_using_vba
 
 __version__ = "0.1.0"
-__all__ = ["TypedWorkSheet"]
+__all__ = [
+    "ArrowSink",
+    "CsvSink",
+    "ModelSink",
+    "ParquetSink",
+    "StreamingTypedWorkSheet",
+    "TypedWorkSheet",
+    "TypedWorkSheetReader",
+]
@@ -0,0 +1,344 @@
+"""Columnar export sinks for dataclasses and Pydantic models.
+
+The sinks take the same model types as TypedWorkSheet and buffer rows,
+writing them in batches to CSV, Parquet or Arrow IPC files. The column
+schema is derived from the model once, so every batch has the same columns
+and types however sparse the values are.
+
+Parquet and Arrow need pyarrow, from the optional `columnar` extra
+(`uv sync --extra columnar`).
+"""
+
+import csv
+import json
+import os
+import types
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from dataclasses import fields as dataclass_fields
+from datetime import date, datetime
+from functools import lru_cache
+from types import TracebackType
+from typing import Any, Generic, TypeVar, Union, get_args, get_origin, get_type_hints
+
+from pydantic import BaseModel
+
+from .worksheet import check_types, model_headers, row_builder
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+T = TypeVar("T")
+
+# Column types a model field can map to. Anything else (nested models,
+# lists, unions) is an object column, stored as JSON text
+SCALAR_TYPES: tuple[type, ...] = (bool, int, float, str, datetime, date)
+
+
+def _column_type(annotation: Any) -> type:
+    """Column type for a field annotation, unwrapping Optional."""
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            return object
+        annotation = args[0]
+
+    if isinstance(annotation, type):
+        # bool is checked before int and datetime before date, since they
+        # are subclasses
+        for scalar in SCALAR_TYPES:
+            if issubclass(annotation, scalar):
+                return scalar
+
+    return object
+
+
+@lru_cache(maxsize=None)
+def model_schema(model_type: type) -> tuple[tuple[str, type], ...]:
+    """Column names and types of a dataclass or Pydantic model, in field order.
+
+    Optional fields take the type they wrap. Fields that aren't a scalar
+    get the type object and are written as JSON text.
+    """
+    if issubclass(model_type, BaseModel):
+        annotations = {
+            name: field.annotation for name, field in model_type.model_fields.items()
+        }
+    else:
+        hints = get_type_hints(model_type)
+        annotations = {field.name: hints[field.name] for field in dataclass_fields(model_type)}
+
+    return tuple(
+        (name, _column_type(annotations[name])) for name in model_headers(model_type)
+    )
+
+
+def _to_text(value: Any) -> str | None:
+    """Serialize the value of an object column."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, BaseModel):
+        return value.model_dump_json(by_alias=True)
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+class ModelSink(ABC, Generic[T]):
+    """Batched writer of model instances to a columnar file.
+
+    Rows are buffered and written every `batch_size` rows and on close.
+    Used as a context manager the sink is closed when the block exits. Like
+    StreamingTypedWorkSheet it doesn't leave a half written export behind:
+    when the block raises, the file is closed and removed.
+
+    Example:
+        with CsvSink("not_found_customers.csv", ExtractedData) as sink:
+            sink.extend(rows)
+    """
+
+    def __init__(self, path: str, model_type: type[T], batch_size: int = 10_000):
+        """
+        Args:
+            path: Output file.
+            model_type: Dataclass or Pydantic model of the rows.
+            batch_size: Rows buffered before a batch is written.
+        """
+        self.path: str = path
+        self.model_type: type[T] = model_type
+        self.batch_size: int = batch_size
+        self.schema: tuple[tuple[str, type], ...] = model_schema(model_type)
+        self._build_row = row_builder(model_type)
+        self._object_columns = tuple(
+            index
+            for index, (_, column_type) in enumerate(self.schema)
+            if column_type is object
+        )
+        self._buffer: list[tuple[Any, ...]] = []
+        self._rows_written = 0
+        self._closed = False
+
+    @property
+    def headers(self) -> list[str]:
+        return [name for name, _ in self.schema]
+
+    @property
+    def row_count(self) -> int:
+        """Return the number of rows appended, written or still buffered."""
+        return self._rows_written + len(self._buffer)
+
+    def append(self, item: T) -> None:
+        """Append a dataclass or Pydantic model instance."""
+        if not isinstance(item, self.model_type):
+            raise TypeError(
+                f"Expected {self.model_type.__name__}, got {type(item).__name__}"
+            )
+        self._buffer.append(self._build_row(item))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def extend(self, items: Iterable[T]) -> int:
+        """Append many instances, type checking them all first.
+
+        Returns:
+            The number of rows appended.
+        """
+        items = list(items)
+        check_types(items, self.model_type)
+
+        build_row = self._build_row
+        for start in range(0, len(items), self.batch_size):
+            self._buffer.extend(
+                build_row(item) for item in items[start : start + self.batch_size]
+            )
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+
+        return len(items)
+
+    def flush(self) -> None:
+        """Write the buffered rows as one batch."""
+        if not self._buffer:
+            return
+
+        rows = self._buffer
+        if self._object_columns:
+            rows = [list(row) for row in rows]
+            for row in rows:
+                for index in self._object_columns:
+                    row[index] = _to_text(row[index])
+
+        self._write_batch(rows)
+        self._rows_written += len(self._buffer)
+        self._buffer = []
+
+    @abstractmethod
+    def _write_batch(self, rows: list[Any]) -> None:
+        """Write rows, each a sequence of values in schema order."""
+
+    @abstractmethod
+    def _close_file(self) -> None:
+        """Finish and close the output file."""
+
+    def close(self) -> None:
+        """Write the remaining rows and close the file.
+
+        If that fails the partial file is removed.
+        """
+        if self._closed:
+            return
+
+        try:
+            self.flush()
+        except BaseException:
+            self.discard()
+            raise
+
+        self._closed = True
+        try:
+            self._close_file()
+        except BaseException:
+            self._remove_file()
+            raise
+
+    def discard(self) -> None:
+        """Close the file without writing the buffered rows and remove it."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._close_file()
+        finally:
+            self._remove_file()
+
+    def _remove_file(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self) -> "ModelSink[T]":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class CsvSink(ModelSink[T]):
+    """Writes rows to a UTF-8 CSV file with a header row.
+
+    The file gets a byte order mark by default so Excel detects the
+    encoding of the Swedish headers and values.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        model_type: type[T],
+        batch_size: int = 10_000,
+        encoding: str = "utf-8-sig",
+        delimiter: str = ",",
+    ):
+        super().__init__(path, model_type, batch_size)
+        self._file = open(path, "w", encoding=encoding, newline="")
+        self._writer = csv.writer(self._file, delimiter=delimiter)
+        self._writer.writerow(self.headers)
+
+    def _write_batch(self, rows: list[Any]) -> None:
+        self._writer.writerows(rows)
+
+    def _close_file(self) -> None:
+        self._file.close()
+
+
+def _require_pyarrow(sink: str) -> None:
+    if pa is None:
+        raise ImportError(
+            f"{sink} needs pyarrow from the columnar extra, "
+            "install it with `uv sync --extra columnar`"
+        )
+
+
+@lru_cache(maxsize=None)
+def arrow_schema(model_type: type) -> "pa.Schema":
+    """Arrow schema of a dataclass or Pydantic model, every column nullable."""
+    _require_pyarrow("arrow_schema")
+    arrow_types = {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        object: pa.string(),
+        datetime: pa.timestamp("us"),
+        date: pa.date32(),
+    }
+    return pa.schema(
+        [(name, arrow_types[column_type]) for name, column_type in model_schema(model_type)]
+    )
+
+
+class _ArrowSink(ModelSink[T]):
+    """Base for sinks that write record batches with the model's arrow schema."""
+
+    def __init__(self, path: str, model_type: type[T], batch_size: int = 10_000):
+        _require_pyarrow(type(self).__name__)
+        super().__init__(path, model_type, batch_size)
+        self.arrow_schema: pa.Schema = arrow_schema(model_type)
+
+    def _record_batch(self, rows: list[Any]) -> "pa.RecordBatch":
+        columns = list(zip(*rows))
+        return pa.RecordBatch.from_arrays(
+            [
+                pa.array(column, type=field.type)
+                for column, field in zip(columns, self.arrow_schema)
+            ],
+            schema=self.arrow_schema,
+        )
+
+
+class ParquetSink(_ArrowSink[T]):
+    """Writes rows to a Parquet file, one row group per batch.
+
+    Requires pyarrow.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        model_type: type[T],
+        batch_size: int = 10_000,
+        compression: str = "zstd",
+    ):
+        super().__init__(path, model_type, batch_size)
+        self._writer = pq.ParquetWriter(path, self.arrow_schema, compression=compression)
+
+    def _write_batch(self, rows: list[Any]) -> None:
+        self._writer.write_batch(self._record_batch(rows))
+
+    def _close_file(self) -> None:
+        self._writer.close()
+
+
+class ArrowSink(_ArrowSink[T]):
+    """Writes rows to an Arrow IPC (Feather v2) file.
+
+    Requires pyarrow.
+    """
+
+    def __init__(self, path: str, model_type: type[T], batch_size: int = 10_000):
+        super().__init__(path, model_type, batch_size)
+        self._writer = pa_ipc.new_file(path, self.arrow_schema)
+
+    def _write_batch(self, rows: list[Any]) -> None:
+        self._writer.write_batch(self._record_batch(rows))
+
+    def _close_file(self) -> None:
+        self._writer.close()
@@ -1,16 +1,75 @@
 """Type-safe Excel worksheet wrapper using dataclasses and Pydantic models."""
 
-from dataclasses import fields as dataclass_fields
+import warnings
+from collections import namedtuple
+from collections.abc import Callable, Iterable
+from dataclasses import MISSING, fields as dataclass_fields
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from types import TracebackType
 from typing import Any, TypeVar, Generic, Iterator
 from pydantic import BaseModel
 
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.filters import AutoFilter
 from openpyxl.worksheet.worksheet import Worksheet
-from openpyxl.worksheet.table import Table, TableStyleInfo
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
 from openpyxl.workbook.workbook import Workbook
+from openpyxl.reader.excel import load_workbook
 
 
 T = TypeVar("T")
 
+TABLE_STYLE = "TableStyleMedium9"
+
+
+def model_headers(model_type: type) -> list[str]:
+    """Column headers of a dataclass or Pydantic model, in field order."""
+    if issubclass(model_type, BaseModel):
+        return list(model_type.model_fields.keys())
+    return [field.name for field in dataclass_fields(model_type)]
+
+
+@lru_cache(maxsize=None)
+def row_builder(model_type: type) -> Callable[[Any], tuple[Any, ...]]:
+    """Compiled function turning an instance into its row values, cached per type."""
+    headers = model_headers(model_type)
+    if len(headers) == 1:
+        # attrgetter returns a bare value for a single attribute
+        getter = attrgetter(headers[0])
+        return lambda item: (getter(item),)
+    return attrgetter(*headers)
+
+
+@lru_cache(maxsize=None)
+def row_record_type(model_type: type) -> type[tuple[Any, ...]]:
+    """Named tuple with one field per model field, cached per type.
+
+    Named tuples have no per-instance __dict__, so they are as light as plain
+    tuples while still giving attribute access to the values.
+    """
+    return namedtuple(f"{model_type.__name__}Row", model_headers(model_type))
+
+
+def check_types(items: list[Any], model_type: type) -> None:
+    """Raise TypeError for the first item that isn't a model_type instance."""
+    for index, item in enumerate(items):
+        if not isinstance(item, model_type):
+            raise TypeError(
+                f"Expected {model_type.__name__} at index {index}, "
+                f"got {type(item).__name__}"
+            )
+
+
+def table_style(name: str = TABLE_STYLE) -> TableStyleInfo:
+    return TableStyleInfo(
+        name=name,
+        showFirstColumn=False,
+        showLastColumn=False,
+        showRowStripes=True,
+        showColumnStripes=True,
+    )
+
 
 class TypedWorkSheet(Generic[T]):
     """A wrapper around openpyxl Worksheet that provides type-safe operations.
@@ -19,7 +78,7 @@ class TypedWorkSheet(Generic[T]):
     """
 
     worksheet: Worksheet
-    _table_style: str = "TableStyleMedium9"
+    _table_style: str = TABLE_STYLE
 
     def __init__(
         self,
@@ -34,13 +93,9 @@ class TypedWorkSheet(Generic[T]):
         self.table_name: str | None = table_name or model_type.__name__
         
         # Handle both Pydantic models and dataclasses
-        if issubclass(model_type, BaseModel):
-            self._expected_headers = list(model_type.model_fields.keys())
-        else:
-            self._expected_headers = [field.name for field in dataclass_fields(model_type)]
+        self._expected_headers = model_headers(model_type)
 
-        # Rest of initialization remains the same
-        self._last_column_letter = chr(64 + len(self._expected_headers))
+        self._last_column_letter = get_column_letter(len(self._expected_headers))
         
         if self.sheet_name not in workbook.sheetnames:
             self.worksheet = workbook.create_sheet(self.sheet_name)
@@ -53,58 +108,89 @@ class TypedWorkSheet(Generic[T]):
         if self.table_name and self.table_name not in self.worksheet.tables:
             self._create_table()
 
+    @property
+    def _last_row(self) -> int:
+        """Last row with a cell in it, 0 for an empty sheet."""
+        # Worksheet._current_row is private to openpyxl, relied on as of
+        # 3.1.5: _add_cell raises it to the highest row of any cell created
+        # and the reader sets it to max_row. It avoids the full cell scan of
+        # max_row, which also reports 1 for an empty sheet.
+        return self.worksheet._current_row
+
     def _init_headers(self) -> None:
         """Initialize the worksheet with headers from the dataclass."""
-        for col, header in enumerate(self._expected_headers, 1):
-            _ = self.worksheet.cell(row=1, column=col, value=header)
+        if self._last_row == 0:
+            # Empty sheet, write the whole header row in one append
+            _ = self.worksheet.append(self._expected_headers)
+            return
+
+        header_cells = next(
+            self.worksheet.iter_rows(
+                min_row=1, max_row=1, max_col=len(self._expected_headers)
+            )
+        )
+        for cell, header in zip(header_cells, self._expected_headers):
+            cell.value = header
 
     def _validate_headers(self) -> bool:
         """Check if the worksheet headers match the dataclass fields."""
-        if self.worksheet.max_row == 0:
+        # Reads only the header row, max_row would scan every cell in the sheet
+        if self._last_row == 0:
             return False
 
-        for col, expected_header in enumerate(self._expected_headers, 1):
-            cell_value = self.worksheet.cell(row=1, column=col).value
-            if cell_value != expected_header:
-                return False
-        return True
+        header = next(
+            self.worksheet.iter_rows(
+                min_row=1,
+                max_row=1,
+                max_col=len(self._expected_headers),
+                values_only=True,
+            )
+        )
+        return list(header) == self._expected_headers
 
     def _create_table(self) -> None:
         """Create a table in the worksheet if it doesn't exist."""
-        if not self.table_name or self.worksheet.max_row < 1:
+        last_row = self._last_row
+        if not self.table_name or last_row < 1:
             return
 
         tab = Table(
             displayName=self.table_name,
-            ref=f"A1:{self._last_column_letter}{max(2, self.worksheet.max_row)}",
+            ref=f"A1:{self._last_column_letter}{max(2, last_row)}",
         )
 
-        style = TableStyleInfo(
-            name=self._table_style,
-            showFirstColumn=False,
-            showLastColumn=False,
-            showRowStripes=True,
-            showColumnStripes=True,
-        )
-        tab.tableStyleInfo = style
+        tab.tableStyleInfo = table_style(self._table_style)
 
         self.worksheet.add_table(tab)
 
-    def _update_table_range(self) -> None:
-        """Update the table range to include all rows."""
+    def _update_table_range(self, last_row: int | None = None) -> None:
+        """Update the table range to include all rows.
+
+        Args:
+            last_row: Last row of the table. Defaults to worksheet.max_row,
+                which scans every cell, so callers that know it pass it.
+        """
         if not self.table_name:
             return
 
         table: Table | None = self.worksheet.tables.get(self.table_name)
-        if table and self.worksheet.max_row > 0:
-            table.ref = f"A1:{self._last_column_letter}{self.worksheet.max_row}"
+        if table is None:
+            return
+
+        last_row = self.worksheet.max_row if last_row is None else last_row
+        if last_row > 0:
+            table.ref = f"A1:{self._last_column_letter}{last_row}"
 
-    def _dataclass_to_row(self, item: T) -> list[Any]:
+    def _dataclass_to_row(self, item: T) -> tuple[Any, ...]:
         """Convert a dataclass or Pydantic model instance to a row format."""
-        if isinstance(item, BaseModel):
-            return [getattr(item, field) for field in self._expected_headers]
+        return row_builder(self.model_type)(item)
+
+    def _after_append(self) -> None:
+        if self.table_name and self.table_name not in self.worksheet.tables:
+            self._create_table()
         else:
-            return [getattr(item, field.name) for field in dataclass_fields(self.model_type)]
+            # Worksheet.append leaves _current_row on the row it wrote
+            self._update_table_range(self._last_row)
 
     def append(self, item: T) -> None:
         """Append a dataclass or Pydantic model instance to the worksheet."""
@@ -114,11 +200,35 @@ class TypedWorkSheet(Generic[T]):
             )
 
         _ = self.worksheet.append(self._dataclass_to_row(item))
-        
-        if self.table_name and self.table_name not in self.worksheet.tables:
-            self._create_table()
-        else:
-            self._update_table_range()
+        self._after_append()
+
+    def extend(self, items: Iterable[T]) -> int:
+        """Append many dataclass or Pydantic model instances at once.
+
+        All items are type checked before any row is written, rows are built
+        with a cached row builder and the table range is updated once.
+
+        Args:
+            items: Instances of the type specified in __init__
+
+        Returns:
+            The number of rows appended.
+
+        Raises:
+            TypeError: If any item is not of the expected type
+        """
+        items = list(items)
+        check_types(items, self.model_type)
+
+        build_row = row_builder(self.model_type)
+        append = self.worksheet.append
+        for item in items:
+            append(build_row(item))
+
+        if items:
+            self._after_append()
+
+        return len(items)
 
     def insert_row(self, item: T, row_index: int) -> None:
         """Insert a dataclass instance at a specific row in the worksheet.
@@ -201,4 +311,298 @@ class TypedWorkSheet(Generic[T]):
     @property
     def row_count(self) -> int:
         """Return the number of data rows (excluding header)."""
-        return max(0, self.worksheet.max_row - 1) 
\ No newline at end of file
+        return max(0, self.worksheet.max_row - 1) 
+
+class StreamingTypedWorkSheet(Generic[T]):
+    """Write-only counterpart of TypedWorkSheet for large exports.
+
+    Backed by an openpyxl ``write_only=True`` workbook, so appended rows are
+    streamed to a temporary file instead of being kept as cell objects.
+    Memory use stays constant however many rows are written. Rows can only
+    be appended. The table is sized once when the sheet is closed, which
+    also saves the workbook.
+
+    Example:
+        with StreamingTypedWorkSheet("export.xlsx", ExtractedData) as sheet:
+            for item in items:
+                sheet.append(item)
+    """
+
+    workbook: Workbook
+    path: str
+
+    def __init__(
+        self,
+        path: str,
+        model_type: type[T],
+        sheet_name: str | None = None,
+        table_name: str | None = None,
+    ):
+        self.path = path
+        self.model_type: type[T] = model_type
+        self.sheet_name: str = sheet_name or model_type.__name__
+        self.table_name: str | None = table_name or model_type.__name__
+        self._expected_headers = model_headers(model_type)
+        self._row_count = 0
+        self._closed = False
+
+        self.workbook = Workbook(write_only=True)
+        self.worksheet = self.workbook.create_sheet(self.sheet_name)
+        self.worksheet.append(self._expected_headers)
+
+    def append(self, item: T) -> None:
+        """Write a dataclass or Pydantic model instance as the next row."""
+        if not isinstance(item, self.model_type):
+            raise TypeError(
+                f"Expected {self.model_type.__name__}, got {type(item).__name__}"
+            )
+        if self._closed:
+            raise ValueError("Worksheet is closed")
+
+        self.worksheet.append(row_builder(self.model_type)(item))
+        self._row_count += 1
+
+    def extend(self, items: Iterable[T]) -> int:
+        """Write many instances, type checked before any row is written.
+
+        Returns:
+            The number of rows written.
+        """
+        if self._closed:
+            raise ValueError("Worksheet is closed")
+
+        items = list(items)
+        check_types(items, self.model_type)
+
+        build_row = row_builder(self.model_type)
+        append = self.worksheet.append
+        for item in items:
+            append(build_row(item))
+
+        self._row_count += len(items)
+        return len(items)
+
+    def _create_table(self) -> None:
+        last_column = get_column_letter(len(self._expected_headers))
+        ref = f"A1:{last_column}{max(2, self._row_count + 1)}"
+
+        tab = Table(displayName=self.table_name, ref=ref)
+        # Write-only sheets can't be read back, so the columns that
+        # add_table normally derives from the header cells are set here
+        tab.tableColumns = [
+            TableColumn(id=index, name=header)
+            for index, header in enumerate(self._expected_headers, 1)
+        ]
+        tab.autoFilter = AutoFilter(ref=ref)
+        tab.tableStyleInfo = table_style()
+
+        with warnings.catch_warnings():
+            # add_table warns about the columns set above in write-only mode
+            warnings.filterwarnings("ignore", message="In write-only mode")
+            self.worksheet.add_table(tab)
+
+    def close(self) -> None:
+        """Size the table and save the workbook to `path`."""
+        if self._closed:
+            return
+
+        if self.table_name:
+            self._create_table()
+
+        self.workbook.save(self.path)
+        self._closed = True
+
+    def discard(self) -> None:
+        """Drop the rows written so far without saving.
+
+        Closes and removes the temporary file openpyxl streams the rows to,
+        which would otherwise be left behind.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        # _rows (the row generator) and _writer (the WorksheetWriter owning
+        # the temporary file) are private to WriteOnlyWorksheet in openpyxl
+        # 3.1.5. Look them up defensively and only warn when cleanup fails,
+        # discard runs while an exception is propagating and must not
+        # replace it.
+        try:
+            rows = getattr(self.worksheet, "_rows", None)
+            if rows is not None:
+                rows.close()
+
+            writer = getattr(self.worksheet, "_writer", None)
+            if writer is not None:
+                writer.close()
+                writer.cleanup()
+        except Exception as e:
+            warnings.warn(f"Could not remove the streamed rows: {e}", stacklevel=2)
+
+    def __enter__(self) -> "StreamingTypedWorkSheet[T]":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        # Don't leave a half written export behind when the rows failed
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    @property
+    def row_count(self) -> int:
+        """Return the number of data rows written (excluding header)."""
+        return self._row_count
+
+
+class TypedWorkSheetReader(Generic[T]):
+    """Read-only, streaming reader for worksheets written by TypedWorkSheet.
+
+    Opens the workbook with openpyxl ``read_only=True``, which parses rows
+    lazily from the file instead of loading every cell, so memory stays
+    bounded however large the workbook is. The header row is read once and
+    mapped to the model fields, so columns may be in any order and extra
+    columns are ignored.
+
+    Rows come out as lightweight named tuples. Building and validating the
+    model only happens on demand, through iter_rows or to_model.
+
+    Example:
+        with TypedWorkSheetReader("not_found_customers.xlsx", ExtractedData) as sheet:
+            for row in sheet.iter_records():
+                if row.Kanal == "CAP":
+                    data = sheet.to_model(row)
+    """
+
+    workbook: Workbook
+    record_type: type[tuple[Any, ...]]
+
+    def __init__(
+        self,
+        path: str,
+        model_type: type[T],
+        sheet_name: str | None = None,
+    ):
+        """
+        Args:
+            path: Workbook file.
+            model_type: Dataclass or Pydantic model the sheet was written from.
+            sheet_name: Sheet to read, defaults to the model name.
+
+        Raises:
+            KeyError: If the sheet doesn't exist.
+            ValueError: If a model field has no column in the header row.
+        """
+        self.model_type: type[T] = model_type
+        self.sheet_name: str = sheet_name or model_type.__name__
+        self.record_type = row_record_type(model_type)
+
+        self.workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            self.worksheet = self.workbook[self.sheet_name]
+            self._columns = self._map_columns()
+            self._keys, self._defaulted = self._map_fields()
+        except Exception:
+            self.workbook.close()
+            raise
+
+    def _map_columns(self) -> tuple[int, ...]:
+        """Find the column index of every model field in the header row."""
+        header = next(self.worksheet.iter_rows(max_row=1, values_only=True), ())
+        positions = {value: index for index, value in enumerate(header)}
+
+        missing = [name for name in self.record_type._fields if name not in positions]
+        if missing:
+            raise ValueError(
+                f"Sheet {self.sheet_name} is missing columns: {', '.join(missing)}"
+            )
+
+        return tuple(positions[name] for name in self.record_type._fields)
+
+    def _map_fields(self) -> tuple[tuple[str, ...], frozenset[str]]:
+        """Resolve the constructor keyword of every field and which have defaults.
+
+        Pydantic fields are passed by their alias, so models with aliases
+        validate without populate_by_name (by_name needs pydantic 2.11).
+        """
+        if issubclass(self.model_type, BaseModel):
+            model_fields = self.model_type.model_fields
+            keys = tuple(
+                field.validation_alias
+                if isinstance(field.validation_alias, str)
+                else field.alias or name
+                for name, field in model_fields.items()
+            )
+            defaulted = frozenset(
+                name
+                for name, field in model_fields.items()
+                if not field.is_required()
+            )
+            return keys, defaulted
+
+        fields = dataclass_fields(self.model_type)
+        keys = tuple(field.name for field in fields)
+        defaulted = frozenset(
+            field.name
+            for field in fields
+            if field.default is not MISSING or field.default_factory is not MISSING
+        )
+        return keys, defaulted
+
+    def iter_records(self) -> Iterator[tuple[Any, ...]]:
+        """Iterate over data rows as named tuples, without validation.
+
+        Empty rows are skipped.
+        """
+        width = max(self._columns) + 1
+        pick = itemgetter(*self._columns)
+        single = len(self._columns) == 1
+        make = self.record_type._make
+
+        for row in self.worksheet.iter_rows(min_row=2, values_only=True):
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            values = (pick(row),) if single else pick(row)
+            if any(value is not None for value in values):
+                yield make(values)
+
+    def to_model(self, record: tuple[Any, ...]) -> T:
+        """Build (and for Pydantic models validate) the model for a record.
+
+        Empty cells come back as None, so fields with a default (such as
+        ExtractedData's "" fields, which are written as empty cells) get
+        their default instead.
+        """
+        data = {
+            key: value
+            for name, key, value in zip(record._fields, self._keys, record)
+            if value is not None or name not in self._defaulted
+        }
+        if issubclass(self.model_type, BaseModel):
+            return self.model_type.model_validate(data)
+        return self.model_type(**data)
+
+    def iter_rows(self) -> Iterator[T]:
+        """Iterate over data rows as model instances."""
+        for record in self.iter_records():
+            yield self.to_model(record)
+
+    def close(self) -> None:
+        """Close the workbook's file handle."""
+        self.workbook.close()
+
+    def __enter__(self) -> "TypedWorkSheetReader[T]":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
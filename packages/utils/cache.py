@@ -0,0 +1,148 @@
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """In-memory LRU cache with an optional expiry per entry."""
+
+    maxsize: int
+    ttl: float | None
+    hits: int
+    misses: int
+    _entries: "OrderedDict[K, tuple[V, float | None]]"
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None) -> None:
+        """
+        Args:
+            maxsize: Entries kept before the least recently used is evicted.
+            ttl: Default seconds an entry stays valid, None for no expiry.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at is None or expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        return None
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            _ = self._entries.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        _ = self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+
+class SqliteCache:
+    """Persistent string key/value store with an optional expiry per entry."""
+
+    _connection: sqlite3.Connection
+    _table: str
+
+    def __init__(
+        self, db_path: str, table: str = "cache", check_same_thread: bool = True
+    ) -> None:
+        """
+        Args:
+            db_path: SQLite file.
+            table: Table the entries are stored in.
+            check_same_thread: Passed to sqlite3.connect. Set to False when
+                the caller serializes access from several threads itself.
+        """
+        self._connection = sqlite3.connect(
+            db_path, check_same_thread=check_same_thread
+        )
+        self._table = table
+        with self._connection:
+            _ = self._connection.execute("PRAGMA journal_mode = WAL")
+            _ = self._connection.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL
+                )
+                """
+            )
+
+    def get(self, key: str) -> str | None:
+        row = self._connection.execute(
+            f"SELECT value, expires_at FROM {self._table} WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+
+        return value
+
+    def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._connection:
+            _ = self._connection.execute(
+                f"""
+                INSERT INTO {self._table} (key, value, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    value = excluded.value, expires_at = excluded.expires_at
+                """,
+                (key, value, expires_at),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connection:
+            _ = self._connection.execute(
+                f"DELETE FROM {self._table} WHERE key = ?", (key,)
+            )
+
+    def purge_expired(self) -> int:
+        """Remove expired entries, returns how many were removed."""
+        with self._connection:
+            cursor = self._connection.execute(
+                f"DELETE FROM {self._table} WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._connection:
+            _ = self._connection.execute(f"DELETE FROM {self._table}")
+
+    def close(self) -> None:
+        self._connection.close()
@@ -0,0 +1,127 @@
+import hashlib
+import threading
+
+from app.logger import logger
+from packages.utils.cache import SqliteCache, TTLCache
+from packages.utils.html_parser import IncidentHtmlDescriptionParser, has_markup
+
+# Part of every key, bump when the parser output changes so entries parsed by
+# an older parser are no longer used
+PARSER_VERSION = 1
+
+
+class DescriptionCache:
+    """
+    Memoizes IncidentHtmlDescriptionParser.parse_text by a hash of the raw HTML.
+
+    Parsed descriptions are kept in a bounded in-memory LRU cache and,
+    when enabled, in a SQLite file shared between runs. Descriptions without
+    markup are cheaper to parse than to hash and are not cached.
+
+    Example:
+        description_cache.enable_disk("app/data/descriptions.db")
+        text = description_cache.parse(incident_html)
+    """
+
+    disk_ttl: float
+    disk_hits: int
+    _memory: TTLCache[str, str]
+    _disk: SqliteCache | None
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        db_path: str | None = None,
+        disk_ttl: float = 30 * 24 * 60 * 60,
+    ) -> None:
+        """
+        Args:
+            maxsize: Parsed descriptions kept in memory.
+            db_path: SQLite file for a cache that survives between runs.
+            disk_ttl: Seconds an entry is kept on disk after it was parsed.
+        """
+        self.disk_ttl = disk_ttl
+        self.disk_hits = 0
+        self._memory = TTLCache(maxsize=maxsize)
+        self._disk = None
+        # Validators run from any thread, the LRU order and the sqlite
+        # connection are not safe for concurrent use on their own
+        self._lock = threading.Lock()
+        if db_path:
+            self.enable_disk(db_path)
+
+    def enable_disk(self, db_path: str) -> None:
+        """Add the on-disk layer and drop its expired entries."""
+        with self._lock:
+            if self._disk:
+                self._disk.close()
+            self._disk = SqliteCache(
+                db_path, table="parsed_descriptions", check_same_thread=False
+            )
+            removed = self._disk.purge_expired()
+        logger.debug(f"Description cache on {db_path}, purged {removed} expired entries")
+
+    @staticmethod
+    def key(html: str) -> str:
+        digest = hashlib.blake2b(html.encode(), digest_size=16).hexdigest()
+        return f"{PARSER_VERSION}:{digest}"
+
+    def parse(self, html: str | None) -> str:
+        """Parse a description, reusing an earlier result for the same HTML."""
+        if html is None or not has_markup(html):
+            return IncidentHtmlDescriptionParser.parse_text(html)
+
+        key = self.key(html)
+
+        with self._lock:
+            text = self._memory.get(key)
+            if text is None and self._disk:
+                text = self._disk.get(key)
+                if text is not None:
+                    self.disk_hits += 1
+                    self._memory.set(key, text)
+        if text is not None:
+            return text
+
+        text = IncidentHtmlDescriptionParser.parse_text(html)
+
+        with self._lock:
+            self._memory.set(key, text)
+            if self._disk:
+                self._disk.set(key, text, self.disk_ttl)
+
+        return text
+
+    @property
+    def hits(self) -> int:
+        return self._memory.hits
+
+    @property
+    def misses(self) -> int:
+        """Lookups that had to parse, i.e. missed both layers."""
+        return self._memory.misses - self.disk_hits
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "size": len(self._memory),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._disk:
+                self._disk.clear()
+
+
+# Shared by the model validators
+description_cache = DescriptionCache()
+
+
+def parse_description(html: str | None) -> str:
+    """Parse an incident description with the shared cache."""
+    return description_cache.parse(html)
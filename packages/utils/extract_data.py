@@ -1,5 +1,5 @@
+from collections.abc import Iterable, Iterator
 from pydantic import BaseModel, Field, field_validator
-import re
 from typing import Any
 
 
@@ -23,6 +23,155 @@ class ExtractedData(BaseModel):
         return v
 
 
+def add_century(personnummer: str) -> str:
+    """Prefix a personnummer without century with 19 or 20."""
+    first_two_digits = personnummer[:2]
+    if not personnummer.startswith(("19", "20")):
+        if "20" <= first_two_digits <= "99":
+            return "19" + personnummer
+        elif "00" <= first_two_digits <= "20":
+            return "20" + personnummer
+    return personnummer
+
+
+def normalize_personal_number(personnummer: str) -> str:
+    """
+    Normalize a personnummer to YYYYMMDDXXXX.
+
+    Removes whitespace and the "-"/"+" separator and adds the century to
+    10-digit numbers.
+    """
+    digits = "".join(c for c in personnummer if c not in " -+\t")
+    return add_century(digits) if len(digits) == 10 else digits
+
+
+# Keys of the "Error/Pnr/channel" format and the standardized header they map to
+FIRST_TYPE_KEYS: dict[str, str] = {
+    "Error": "Orsak",
+    "Pnr": "Personnummer",
+    "channel": "Kanal",
+    "storeId": "Butiksnummer",
+    "Time": "Ansökningsdatum",
+    "receiptNumber": "Kvittonummer",
+    "id": "Ordernummer",
+}
+
+# Keys of the "Till kundservice med beskrivning" format
+SECOND_TYPE_KEYS: dict[str, str] = {
+    "Till kundservice med beskrivning": "Orsak",
+    "Personnummer": "Personnummer",
+    "Kanal": "Kanal",
+    "Store id": "Butiksnummer",
+    "Ansökningsdatum": "Ansökningsdatum",
+    "Kvittonummer": "Kvittonummer",
+    "Id": "Ordernummer",
+    "Epost": "Epost",
+}
+
+# A line starting with one of these followed by ": " marks the second format
+SECOND_TYPE_INDICATORS = (
+    "Till kundservice med beskrivning",
+    "Tekniskt fel eller fall som inte hanteras med beskrivning",
+)
+
+
+class DescriptionExtractor:
+    """
+    Single-pass extractor for creation failure descriptions.
+
+    The description is split into lines once and every "key: value" line is
+    indexed by its lower-cased key, keeping the first occurrence. Both key
+    sets and the format indicators are resolved from that index, matching
+    the case-insensitive "^key:(.*)$" semantics of the original per-key
+    regexes.
+    """
+
+    _first_type: tuple[tuple[str, str], ...]
+    _second_type: tuple[tuple[str, str], ...]
+    _known_keys: frozenset[str]
+    _indicators: frozenset[str]
+
+    def __init__(self) -> None:
+        self._first_type = tuple((k.lower(), v) for k, v in FIRST_TYPE_KEYS.items())
+        self._second_type = tuple((k.lower(), v) for k, v in SECOND_TYPE_KEYS.items())
+        self._indicators = frozenset(i.lower() for i in SECOND_TYPE_INDICATORS)
+        self._known_keys = frozenset(
+            [k for k, _ in self._first_type]
+            + [k for k, _ in self._second_type]
+            + list(self._indicators)
+        )
+
+    def _index(self, text: str) -> tuple[dict[str, str], bool]:
+        """Index the known keys of a text and detect the second format."""
+        index: dict[str, str] = {}
+        second_type = False
+
+        for line in text.split("\n"):
+            colon = line.find(":")
+            if colon <= 0:
+                continue
+
+            key = line[:colon].lower()
+            if key not in self._known_keys:
+                continue
+
+            if not second_type and key in self._indicators:
+                second_type = line.startswith(" ", colon + 1)
+
+            if key not in index:
+                index[key] = line[colon + 1 :].strip()
+
+        return index, second_type
+
+    def extract(self, text: str, cas: str) -> ExtractedData:
+        index, second_type = self._index(text)
+
+        standardized_data = {
+            "Orsak": "",
+            "Personnummer": "",
+            "Kanal": "",
+            "Butiksnummer": "",
+            "Ansökningsdatum": "",
+            "Kvittonummer": "",
+            "Ordernummer": "",
+            "Epost": "",
+            "Cas": cas,
+        }
+
+        for key, header in self._second_type if second_type else self._first_type:
+            standardized_data[header] = index.get(key, "")
+
+        if second_type and standardized_data["Personnummer"]:
+            standardized_data["Personnummer"] = add_century(
+                standardized_data["Personnummer"]
+            )
+
+        return ExtractedData(**standardized_data)
+
+    def extract_many(
+        self, items: Iterable[tuple[str, str]]
+    ) -> Iterator[ExtractedData]:
+        """
+        Extract a batch of descriptions.
+
+        Args:
+            items: (text, cas) pairs.
+
+        Yields:
+            ExtractedData for each pair, in order.
+        """
+        for text, cas in items:
+            yield self.extract(text, cas)
+
+
+_extractor = DescriptionExtractor()
+
+
+def extract_many(items: Iterable[tuple[str, str]]) -> Iterator[ExtractedData]:
+    """Extract a batch of (text, cas) pairs with the shared extractor."""
+    return _extractor.extract_many(items)
+
+
 def extract_key_values(text: str, cas: str) -> ExtractedData:
     """
     Extracts specific key-value pairs from the provided text based on predefined key sets
@@ -38,99 +187,4 @@ def extract_key_values(text: str, cas: str) -> ExtractedData:
     Raises:
         ValueError: If cas doesn't start with 'cas-' or if required fields are missing.
     """
-    # Define the two sets of keys
-    first_type_keys = [
-        "Error",
-        "Pnr",
-        "channel",
-        "storeId",
-        "Time",
-        "receiptNumber",
-        "id",
-    ]
-    second_type_keys = [
-        "Till kundservice med beskrivning",
-        "Personnummer",
-        "Kanal",
-        "Store id",
-        "Ansökningsdatum",
-        "Kvittonummer",
-        "Id",
-        "Epost",
-    ]
-
-    # Define the key indicator regex pattern
-    key_indicator = "Till kundservice med beskrivning|Tekniskt fel eller fall som inte hanteras med beskrivning"
-    indicator_pattern = f"^({key_indicator}): .*"
-    indicator_regex = re.compile(indicator_pattern, re.MULTILINE | re.IGNORECASE)
-
-    # Determine which set of keys to use
-    use_second_type_keys = bool(indicator_regex.search(text))
-    selected_keys = second_type_keys if use_second_type_keys else first_type_keys
-
-    # Extract key-value pairs
-    extracted: dict[str, str] = {}
-    for key in selected_keys:
-        escaped_key = re.escape(key)
-        pattern = f"^{escaped_key}:(.*)$"
-        regex = re.compile(pattern, re.MULTILINE | re.IGNORECASE)
-        match = regex.search(text)
-        value = match.group(1).strip() if match else ""
-        extracted[key] = value
-
-    # Handle special case for 'Personnummer' in second_type_keys
-    if use_second_type_keys and "Personnummer" in selected_keys:
-        personnummer = extracted.get("Personnummer", "")
-        if personnummer:
-            first_two_digits = personnummer[:2]
-            if not personnummer.startswith(("19", "20")):
-                if "20" <= first_two_digits <= "99":
-                    extracted["Personnummer"] = "19" + personnummer
-                elif "00" <= first_two_digits <= "20":
-                    extracted["Personnummer"] = "20" + personnummer
-
-    # Mapping to standardized headers
-    if use_second_type_keys:
-        key_mapping = {
-            "Till kundservice med beskrivning": "Orsak",
-            "Personnummer": "Personnummer",
-            "Kanal": "Kanal",
-            "Store id": "Butiksnummer",
-            "Ansökningsdatum": "Ansökningsdatum",
-            "Kvittonummer": "Kvittonummer",
-            "Id": "Ordernummer",
-            "Epost": "Epost",
-        }
-    else:
-        key_mapping = {
-            "Error": "Orsak",
-            "Pnr": "Personnummer",
-            "channel": "Kanal",
-            "storeId": "Butiksnummer",
-            "Time": "Ansökningsdatum",
-            "receiptNumber": "Kvittonummer",
-            "id": "Ordernummer",
-        }
-
-    standardized_data = {
-        "Orsak": "",
-        "Personnummer": "",
-        "Kanal": "",
-        "Butiksnummer": "",
-        "Ansökningsdatum": "",
-        "Kvittonummer": "",
-        "Ordernummer": "",
-        "Epost": "",
-        "Cas": cas,
-    }
-
-    for original_key, value in extracted.items():
-        standardized_key = key_mapping.get(original_key)
-        if standardized_key:
-            standardized_data[standardized_key] = value
-
-    # Add the cas number to the standardized data
-    # standardized_data["Cas"] = cas
-
-    # Create and return the Pydantic model
-    return ExtractedData(**standardized_data)
+    return _extractor.extract(text, cas)
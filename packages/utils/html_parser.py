@@ -1,63 +1,89 @@
 from html.parser import HTMLParser
 from typing import override
 
+# Elements that are separated from the surrounding text by an empty line
+BLOCK_TAGS = frozenset(("h1", "h2", "li", "p"))
+
+# Outlook prepends this banner to mail from new senders
+WARNING_START = "You don't often get email from"
+WARNING_END = "Learn why this is important"
+WARNING_FRAGMENTS = (WARNING_END, "https://aka.ms/")
+
+
+def has_markup(text: str) -> bool:
+    """Whether text contains tags or character references the parser acts on."""
+    return "<" in text or "&" in text
+
 
 class IncidentHtmlDescriptionParser(HTMLParser):
-    _instance: "IncidentHtmlDescriptionParser | None" = None
+    """
+    Converts an incident description from HTML to plain text.
+
+    All state lives on the instance and parse_text creates a new instance per
+    call, so it is safe to use from several threads, tasks or processes at
+    once.
+    """
+
+    text: list[str]
+    skip_until_closing_bracket: bool
+    in_warning_message: bool
 
     def __init__(self):
         super().__init__(convert_charrefs=True)
-        self.text: list[str] = []
-        self.skip_until_closing_bracket: bool = False
-        self.current_line: list[str] = []
-        self.in_warning_message: bool = False
-
-    @classmethod
-    def get_instance(cls) -> "IncidentHtmlDescriptionParser":
-        if cls._instance is None:
-            cls._instance = cls()
-        return cls._instance
+        self.text = []
+        self.skip_until_closing_bracket = False
+        self.in_warning_message = False
 
     @classmethod
     def parse_text(cls, text: str | None) -> str:
-        """Class method to parse HTML text using a cached instance."""
+        """Parse HTML text into lines of plain text."""
         if text is None:
             return ""
 
-        instance = cls.get_instance()
-        instance.text = []  # Reset the text buffer
-        instance.skip_until_closing_bracket = False  # Reset the skip flag
-        instance.in_warning_message = False
-        instance.current_line = []
-        instance.feed(text)
-        return "\n".join(instance.text)  # Join with newlines instead of spaces
+        instance = cls()
+
+        # Without tags or character references the parser would pass the
+        # whole input to handle_data in one call
+        if not has_markup(text):
+            instance.handle_data(text)
+        else:
+            instance.feed(text)
+            instance.close()
+
+        return "\n".join(instance.text)
 
     @override
     def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
         # Add newlines before certain elements
-        if tag in ['h1', 'h2', 'li', 'p']:
-            self.text.append('')  # Add empty line before these elements
+        if tag in BLOCK_TAGS:
+            self.text.append("")  # Add empty line before these elements
 
     @override
     def handle_endtag(self, tag: str) -> None:
         # Add newlines after certain elements
-        if tag in ['h1', 'h2', 'li', 'p']:
+        if tag in BLOCK_TAGS:
             if self.text and self.text[-1]:  # If there's text and it's not empty
-                self.text.append('')  # Add empty line after these elements
+                self.text.append("")  # Add empty line after these elements
+
+    def _append_after_bracket(self, text: str) -> None:
+        """Keep what follows the closing bracket of the warning banner."""
+        _, _, rest = text.partition("]")
+        cleaned_text = rest.strip()
+        if cleaned_text and not any(x in cleaned_text for x in WARNING_FRAGMENTS):
+            self.text.append(cleaned_text)
 
     @override
     def handle_data(self, data: str):
         text = data.strip()
 
         # Check for warning message start
-        if "You don't often get email from" in text:
+        if WARNING_START in text:
             self.in_warning_message = True
-            self.current_line = []
 
             if "[" in text:
-                parts = text.split("[", 1)
-                if parts[0].strip():
-                    self.text.append(parts[0].strip())
+                before = text.split("[", 1)[0].strip()
+                if before:
+                    self.text.append(before)
                 self.skip_until_closing_bracket = True
             return
 
@@ -66,15 +92,8 @@ class IncidentHtmlDescriptionParser(HTMLParser):
             if "]" in text:
                 self.skip_until_closing_bracket = False
                 self.in_warning_message = False
-                parts = text.split("]", 1)
-                if len(parts) > 1 and parts[1].strip():
-                    cleaned_text = parts[1].strip()
-                    if not any(
-                        x in cleaned_text
-                        for x in ["Learn why this is important", "https://aka.ms/"]
-                    ):
-                        self.text.append(cleaned_text)
-            elif "Learn why this is important" in text:
+                self._append_after_bracket(text)
+            elif WARNING_END in text:
                 self.in_warning_message = False
             return
 
@@ -82,29 +101,12 @@ class IncidentHtmlDescriptionParser(HTMLParser):
         if self.skip_until_closing_bracket:
             if "]" in text:
                 self.skip_until_closing_bracket = False
-                parts = text.split("]", 1)
-                if len(parts) > 1 and parts[1].strip():
-                    cleaned_text = parts[1].strip()
-                    if not any(
-                        x in cleaned_text
-                        for x in ["Learn why this is important", "https://aka.ms/"]
-                    ):
-                        self.text.append(cleaned_text)
+                self._append_after_bracket(text)
             return
 
-        # Skip if we're in skip mode or if it's a comment
-        if (
-            text
-            and not self.skip_until_closing_bracket
-            and not text.startswith("<!--")
-            and not text.endswith("-->")
-        ):
-            # Format key-value pairs with colons
-            if ": " in text and not text.startswith("From:") and not text.startswith("Sent:"):
-                key, value = text.split(": ", 1)
-                self.text.append(f"{key}: {value}")
-            else:
-                self.text.append(text)
+        # Skip comments
+        if text and not text.startswith("<!--") and not text.endswith("-->"):
+            self.text.append(text)
 
     @override
     def handle_comment(self, data: str):
@@ -0,0 +1,37 @@
+import json
+import random
+from typing import Any
+
+from app.logger import logger
+
+
+class Tracer:
+    """
+    Sampled, structured debug traces.
+
+    Off by default. With a sample rate above zero a share of the calls to
+    `sampled()` return True, and `record()` logs the event as one JSON line.
+    Callers check `sampled()` first so a disabled tracer costs a single
+    comparison and builds no trace data.
+    """
+
+    name: str
+    sample_rate: float
+
+    def __init__(self, name: str, sample_rate: float = 0.0) -> None:
+        self.name = name
+        self.sample_rate = sample_rate
+
+    def sampled(self) -> bool:
+        if self.sample_rate <= 0:
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def record(self, event: str, **fields: Any) -> None:
+        logger.debug(
+            json.dumps(
+                {"trace": self.name, "event": event, **fields},
+                ensure_ascii=False,
+                default=str,
+            )
+        )
@@ -0,0 +1,135 @@
+"""Microbenchmark of the per-lookup cost of parsing a customer lookup response.
+
+Compares the previous print-based parsing of get_customer_by_personal_number
+with parse_customer_lookup, with tracing disabled and fully sampled.
+
+Run with: python -m scripts.bench_customer_lookup
+"""
+
+import contextlib
+import io
+import json
+import timeit
+
+import httpx
+
+from packages.crm.actions import (
+    ActionDataResponse,
+    customer_lookup_trace,
+    parse_customer_lookup,
+)
+from app.logger import logger
+
+PERSONAL_NUMBER = "199001011234"
+
+CUSTOMER = {
+    "type": "physical-person",
+    "status": "ACTIVE",
+    "personalIdNumber": PERSONAL_NUMBER,
+    "firstName": "Anna",
+    "lastName": "Andersson",
+    "birthDate": "1990-01-01",
+    "name": "Anna Andersson",
+    "addresses": [
+        {
+            "type": "physical",
+            "careOf": None,
+            "addressRow1": "Storgatan 1",
+            "city": "Stockholm",
+            "countryCode": "SE",
+            "physicalAddressType": None,
+            "flags": [],
+            "addressId": 1,
+            "zipCode": "11122",
+            "typeOfAddress": "HOME",
+        }
+    ],
+    "kimCustomerId": 30001911431,
+    "role": "customer",
+    "email": "anna@example.com",
+}
+
+RESPONSE = httpx.Response(
+    200,
+    json={"ResponseStatus": 200, "Response": json.dumps(CUSTOMER)},
+)
+
+
+def legacy_parse(response: httpx.Response, personal_number: str) -> ActionDataResponse:
+    """The parsing and debug printing previously done on every lookup."""
+    raw_response = response.json()
+
+    print(f"\nDEBUG - Initial API Response for {personal_number}:")
+    print(json.dumps(raw_response, indent=2))
+
+    response_data = json.loads(raw_response["Response"])
+
+    print("\nDEBUG - Parsed Response data:")
+    print(json.dumps(response_data, indent=2))
+
+    if raw_response["ResponseStatus"] == 404:
+        raw_response["Response"] = response_data
+        print("\nDEBUG - Mapped to CustomerErrorResponse")
+    else:
+        if isinstance(response_data, dict) and "kimCustomerId" in response_data:
+            print("\nDEBUG - Response data type before mapping:", type(response_data))
+            print("DEBUG - Response data before mapping:", response_data)
+            raw_response["Response"] = response_data
+            print("\nDEBUG - Mapped to CustomerSuccessResponse")
+            print(
+                "DEBUG - Response type after mapping:", type(raw_response["Response"])
+            )
+        else:
+            raw_response["Response"] = {"items": []}
+            print("\nDEBUG - Mapped to CustomerEmptyResponse")
+
+    print("\nDEBUG - Final data being sent to ActionDataResponse:")
+    print(json.dumps(raw_response, indent=2))
+
+    result = ActionDataResponse.model_validate(raw_response)
+    print("\nDEBUG - After Pydantic validation:")
+    print(f"Response discriminator type: {type(result.Response)}")
+    print(f"Response data: {result.Response}")
+    print(f"Raw dict: {result.model_dump()}")
+
+    return result
+
+
+def bench(name: str, func, number: int = 20_000) -> float:
+    seconds = timeit.timeit(func, number=number)
+    per_lookup = seconds / number * 1e6
+    print(f"{name:<32} {per_lookup:8.1f} µs/lookup")
+    return per_lookup
+
+
+def main() -> None:
+    # Printing to an in-memory buffer understates the real cost of a terminal
+    # or a log pipe, so the legacy numbers are a lower bound
+    with contextlib.redirect_stdout(io.StringIO()):
+        legacy = timeit.timeit(
+            lambda: legacy_parse(RESPONSE, PERSONAL_NUMBER), number=20_000
+        )
+
+    print(f"{'legacy (prints to buffer)':<32} {legacy / 20_000 * 1e6:8.1f} µs/lookup")
+
+    customer_lookup_trace.sample_rate = 0.0
+    current = bench(
+        "parse_customer_lookup",
+        lambda: parse_customer_lookup(RESPONSE, PERSONAL_NUMBER),
+    )
+
+    customer_lookup_trace.sample_rate = 1.0
+    logger.disabled = True
+    traced = bench(
+        "parse_customer_lookup (traced)",
+        lambda: parse_customer_lookup(RESPONSE, PERSONAL_NUMBER),
+    )
+    logger.disabled = False
+    customer_lookup_trace.sample_rate = 0.0
+
+    print(f"\nSpeedup without tracing: {legacy / 20_000 * 1e6 / current:.1f}x")
+    print(f"Tracing overhead: {traced - current:.1f} µs/lookup")
+
+
+if __name__ == "__main__":
+    main()
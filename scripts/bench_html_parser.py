@@ -0,0 +1,168 @@
+"""Benchmark of HTML description parsing over saved incident descriptions.
+
+Compares the previous shared-instance parser with the reentrant
+IncidentHtmlDescriptionParser.parse_text, on the descriptions saved in
+latest_incidents.json and on the same descriptions wrapped in
+Outlook style HTML, so both the no-markup fast path and the full parser
+are measured.
+
+Run with: python -m scripts.bench_html_parser [path/to/latest_incidents.json]
+"""
+
+import html
+import json
+import sys
+import timeit
+from html.parser import HTMLParser
+
+from packages.utils.html_parser import IncidentHtmlDescriptionParser
+
+DEFAULT_PATH = "latest_incidents.json"
+
+BANNER = (
+    "<table><tr><td><div>You don't often get email from kund@example.com. "
+    "[Learn why this is important]</div></td></tr></table>"
+)
+
+
+class LegacyParser(HTMLParser):
+    """The previous parser: one shared instance, reset before every feed."""
+
+    _instance: "LegacyParser | None" = None
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.text: list[str] = []
+        self.skip_until_closing_bracket = False
+        self.current_line: list[str] = []
+        self.in_warning_message = False
+
+    @classmethod
+    def parse_text(cls, text: str | None) -> str:
+        if text is None:
+            return ""
+        if cls._instance is None:
+            cls._instance = cls()
+        instance = cls._instance
+        instance.text = []
+        instance.skip_until_closing_bracket = False
+        instance.in_warning_message = False
+        instance.current_line = []
+        instance.feed(text)
+        return "\n".join(instance.text)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ["h1", "h2", "li", "p"]:
+            self.text.append("")
+
+    def handle_endtag(self, tag):
+        if tag in ["h1", "h2", "li", "p"]:
+            if self.text and self.text[-1]:
+                self.text.append("")
+
+    def handle_data(self, data):
+        text = data.strip()
+        if "You don't often get email from" in text:
+            self.in_warning_message = True
+            self.current_line = []
+            if "[" in text:
+                parts = text.split("[", 1)
+                if parts[0].strip():
+                    self.text.append(parts[0].strip())
+                self.skip_until_closing_bracket = True
+            return
+        if self.in_warning_message:
+            if "]" in text:
+                self.skip_until_closing_bracket = False
+                self.in_warning_message = False
+                parts = text.split("]", 1)
+                if len(parts) > 1 and parts[1].strip():
+                    cleaned_text = parts[1].strip()
+                    if not any(
+                        x in cleaned_text
+                        for x in ["Learn why this is important", "https://aka.ms/"]
+                    ):
+                        self.text.append(cleaned_text)
+            elif "Learn why this is important" in text:
+                self.in_warning_message = False
+            return
+        if self.skip_until_closing_bracket:
+            if "]" in text:
+                self.skip_until_closing_bracket = False
+                parts = text.split("]", 1)
+                if len(parts) > 1 and parts[1].strip():
+                    cleaned_text = parts[1].strip()
+                    if not any(
+                        x in cleaned_text
+                        for x in ["Learn why this is important", "https://aka.ms/"]
+                    ):
+                        self.text.append(cleaned_text)
+            return
+        if (
+            text
+            and not self.skip_until_closing_bracket
+            and not text.startswith("<!--")
+            and not text.endswith("-->")
+        ):
+            if ": " in text and not text.startswith("From:") and not text.startswith("Sent:"):
+                key, value = text.split(": ", 1)
+                self.text.append(f"{key}: {value}")
+            else:
+                self.text.append(text)
+
+
+def load_descriptions(path: str) -> list[str]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            incidents = json.load(f)
+    except FileNotFoundError:
+        sys.exit(f"{path} not found, save the latest incidents first or pass a path")
+
+    if isinstance(incidents, dict):
+        incidents = incidents.get("value", [])
+
+    descriptions = [i["description"] for i in incidents if i.get("description")]
+    if not descriptions:
+        sys.exit(f"{path} has no incident descriptions")
+    return descriptions
+
+
+def to_html(description: str) -> str:
+    paragraphs = "".join(
+        f"<p>{html.escape(line)}</p>" for line in description.splitlines()
+    )
+    return f"<html><body>{BANNER}<div>{paragraphs}</div></body></html>"
+
+
+def bench(name: str, parse, descriptions: list[str], number: int) -> float:
+    # Best of several runs, single runs are dominated by scheduling noise
+    seconds = min(
+        timeit.repeat(lambda: [parse(d) for d in descriptions], number=number, repeat=5)
+    )
+    per_description = seconds / (number * len(descriptions)) * 1e6
+    print(f"{name:<28} {per_description:8.1f} µs/description")
+    return per_description
+
+
+def main() -> None:
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    plain = load_descriptions(path)
+    marked_up = [to_html(d) for d in plain]
+    number = max(1, 5_000 // len(plain))
+
+    for d in marked_up:
+        assert LegacyParser.parse_text(d) == IncidentHtmlDescriptionParser.parse_text(d)
+
+    print(f"{len(plain)} descriptions, {number} rounds\n")
+
+    for label, descriptions in (("plain text", plain), ("HTML", marked_up)):
+        print(label)
+        legacy = bench("  legacy shared instance", LegacyParser.parse_text, descriptions, number)
+        current = bench(
+            "  parse_text", IncidentHtmlDescriptionParser.parse_text, descriptions, number
+        )
+        print(f"  speedup {legacy / current:.1f}x\n")
+
+
+if __name__ == "__main__":
+    main()
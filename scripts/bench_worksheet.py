@@ -0,0 +1,86 @@
+"""Benchmark of appending rows to TypedWorkSheet one by one versus extend.
+
+All variants run on an in-memory workbook with the table enabled, using
+ExtractedData rows as written by handle_creation_failure. Saving is not
+included. The previous append, which rescanned every cell through
+worksheet.max_row to resize the table after each row, is quadratic, so it
+is only timed on the first LEGACY_ROWS rows.
+
+Run with: python -m scripts.bench_worksheet [rows]
+"""
+
+import sys
+import time
+
+from openpyxl import Workbook
+
+from packages.py_xlsx import TypedWorkSheet
+from packages.utils.extract_data import ExtractedData
+
+ITEM = ExtractedData(
+    Orsak="Tekniskt fel",
+    Personnummer="199001011234",
+    Ansökningsdatum="2024-01-01",
+    Kanal="CAP",
+    Butiksnummer="1234",
+    Kvittonummer="987654",
+    Ordernummer="1",
+    Cas="CAS-123456-ABCDEF",
+    Epost="kund@example.com",
+)
+
+
+LEGACY_ROWS = 5_000
+
+
+def bench_legacy_append(items: list[ExtractedData]) -> float:
+    sheet = TypedWorkSheet(Workbook(), ExtractedData)
+    worksheet = sheet.worksheet
+    headers = sheet._expected_headers
+    started = time.perf_counter()
+    for item in items:
+        if not isinstance(item, ExtractedData):
+            raise TypeError
+        worksheet.append([getattr(item, field) for field in headers])
+        table = worksheet.tables.get(sheet.table_name)
+        if table and worksheet.max_row > 0:
+            table.ref = f"A1:{sheet._last_column_letter}{worksheet.max_row}"
+    return time.perf_counter() - started
+
+
+def bench_append(items: list[ExtractedData]) -> float:
+    sheet = TypedWorkSheet(Workbook(), ExtractedData)
+    started = time.perf_counter()
+    for item in items:
+        sheet.append(item)
+    return time.perf_counter() - started
+
+
+def bench_extend(items: list[ExtractedData]) -> float:
+    sheet = TypedWorkSheet(Workbook(), ExtractedData)
+    started = time.perf_counter()
+    _ = sheet.extend(items)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    items = [ITEM.model_copy() for _ in range(rows)]
+
+    legacy_rows = min(rows, LEGACY_ROWS)
+    legacy = bench_legacy_append(items[:legacy_rows])
+    append = bench_append(items)
+    extend = bench_extend(items)
+
+    print(f"{rows} rows")
+    print(
+        f"{'legacy append':<20} {legacy:6.2f} s  {legacy / legacy_rows * 1e6:6.1f} µs/row"
+        f" (first {legacy_rows} rows only, grows with the row count)"
+    )
+    print(f"{'append one by one':<20} {append:6.2f} s  {append / rows * 1e6:6.1f} µs/row")
+    print(f"{'extend':<20} {extend:6.2f} s  {extend / rows * 1e6:6.1f} µs/row")
+    print(f"extend vs append: {append / extend:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
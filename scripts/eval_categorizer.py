@@ -0,0 +1,89 @@
+"""Offline evaluation of IncidentCategorizer on labelled incidents.
+
+Seed fixtures from the latest_incidents.json in the repo root, label them
+by filling in "expected", then run the categorizer against them:
+
+    python -m scripts.eval_categorizer seed latest_incidents.json
+    python -m scripts.eval_categorizer run --model rules --rules --repeat 2
+
+--model is "rules" (a FunctionModel answering with the rule classifier),
+"test" (pydantic-ai TestModel) or a model name such as openai:gpt-4o.
+With --repeat the cases are run again against the same cache, which shows
+the cache hit rate of an unchanged queue. Set LOGFIRE_SEND_TO_LOGFIRE=false
+to run without a Logfire project.
+"""
+
+import argparse
+import asyncio
+
+from pydantic_ai.models import Model
+from pydantic_ai.models.test import TestModel
+
+from packages.agents.cache import CategorizeCache
+from packages.agents.categorizer import IncidentCategorizer
+from packages.agents.evaluation import (
+    evaluate,
+    load_cases,
+    rule_based_model,
+    seed_cases,
+)
+from packages.agents.rules import RuleClassifier
+
+DEFAULT_CASES_PATH = "app/data/categorizer_eval.json"
+
+
+def build_model(name: str, latency: float) -> Model | str:
+    if name == "rules":
+        return rule_based_model(latency=latency)
+    if name == "test":
+        return TestModel()
+    return name
+
+
+async def run(args: argparse.Namespace) -> None:
+    cases = load_cases(args.cases)
+    categorizer = IncidentCategorizer(
+        model=build_model(args.model, args.latency),
+        cache=CategorizeCache(db_path=args.cache),
+        rules=RuleClassifier() if args.rules else None,
+        rule_threshold=args.threshold,
+    )
+
+    for round_number in range(1, args.repeat + 1):
+        report = await evaluate(categorizer, cases, concurrency=args.concurrency)
+        print(f"== Round {round_number} ({args.model}) ==")
+        print(report.format())
+        print()
+
+    print(categorizer.stats.report())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="Write unlabelled cases")
+    seed.add_argument("latest_incidents")
+    seed.add_argument("--cases", default=DEFAULT_CASES_PATH)
+
+    evaluate_parser = commands.add_parser("run", help="Evaluate the categorizer")
+    evaluate_parser.add_argument("--cases", default=DEFAULT_CASES_PATH)
+    evaluate_parser.add_argument("--model", default="rules")
+    evaluate_parser.add_argument("--cache", default=None, help="SQLite cache file")
+    evaluate_parser.add_argument("--rules", action="store_true")
+    evaluate_parser.add_argument("--threshold", type=float, default=0.8)
+    evaluate_parser.add_argument("--latency", type=float, default=0.0)
+    evaluate_parser.add_argument("--concurrency", type=int, default=4)
+    evaluate_parser.add_argument("--repeat", type=int, default=1)
+
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        count = seed_cases(args.latest_incidents, args.cases)
+        print(f"Wrote {count} cases to {args.cases}, fill in 'expected' to score them")
+    else:
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
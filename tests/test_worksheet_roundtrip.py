@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from dataclasses import dataclass
+
+from openpyxl import Workbook
+from pydantic import BaseModel, Field
+
+from packages.py_xlsx import StreamingTypedWorkSheet, TypedWorkSheet, TypedWorkSheetReader
+from packages.utils.extract_data import ExtractedData
+
+
+class Aliased(BaseModel):
+    name: str = Field(alias="Namn")
+    city: str = Field(alias="Ort", default="")
+
+
+@dataclass
+class Person:
+    name: str
+    age: int | None = None
+    email: str = ""
+
+
+EXTRACTED = [
+    ExtractedData(Personnummer="199001011234", Cas="CAS-1"),
+    ExtractedData(
+        Orsak="Fel",
+        Personnummer="198512241234",
+        Ansökningsdatum="2024-01-01",
+        Kanal="CAP",
+        Butiksnummer="12",
+        Kvittonummer="34",
+        Ordernummer="56",
+        Cas="CAS-2",
+        Epost="kund@example.com",
+    ),
+]
+
+
+class WorksheetRoundTripTest(unittest.TestCase):
+    """Rows written by either writer read back equal through the reader."""
+
+    def setUp(self) -> None:
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "roundtrip.xlsx")
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def write(self, writer: str, model_type: type, items: list) -> None:
+        if writer == "typed":
+            workbook = Workbook()
+            sheet = TypedWorkSheet(workbook, model_type)
+            _ = sheet.extend(items)
+            workbook.save(self.path)
+        else:
+            with StreamingTypedWorkSheet(self.path, model_type) as sheet:
+                _ = sheet.extend(items)
+
+    def read(self, model_type: type) -> list:
+        with TypedWorkSheetReader(self.path, model_type) as sheet:
+            return list(sheet.iter_rows())
+
+    def test_defaults_written_as_empty_cells(self) -> None:
+        for writer in ("typed", "streaming"):
+            with self.subTest(writer=writer):
+                self.write(writer, ExtractedData, EXTRACTED)
+                self.assertEqual(self.read(ExtractedData), EXTRACTED)
+
+    def test_aliased_model(self) -> None:
+        items = [Aliased(Namn="Anna", Ort="Umeå"), Aliased(Namn="Bo")]
+        for writer in ("typed", "streaming"):
+            with self.subTest(writer=writer):
+                self.write(writer, Aliased, items)
+                self.assertEqual(self.read(Aliased), items)
+
+    def test_dataclass(self) -> None:
+        items = [Person("Anna", 30, "anna@example.com"), Person("Bo")]
+        for writer in ("typed", "streaming"):
+            with self.subTest(writer=writer):
+                self.write(writer, Person, items)
+                self.assertEqual(self.read(Person), items)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()